@@ -5,18 +5,20 @@ Top level script. Calls other functions that generate datasets that this script
 """
 
 import logging
-from os import getenv
+from datetime import UTC, datetime
+from os import getenv, makedirs
 from os.path import expanduser, join
 
+from dateutil.relativedelta import relativedelta
 from hdx.api.configuration import Configuration
+from hdx.data.dataset import Dataset
+from hdx.data.showcase import Showcase
 from hdx.data.user import User
 from hdx.facades.infer_arguments import facade
-from hdx.location.wfp_api import WFPAPI
 from hdx.utilities.downloader import Download
 from hdx.utilities.easy_logging import setup_logging
 from hdx.utilities.loader import load_yaml
 from hdx.utilities.path import (
-    progress_storing_folder,
     script_dir_plus_file,
     temp_dir_batch,
 )
@@ -25,7 +27,13 @@ from hdx.utilities.retriever import Retrieve
 from hdx.scraper.wfp.foodprices._version import __version__
 from hdx.scraper.wfp.foodprices.country.dataset_generator import DatasetGenerator
 from hdx.scraper.wfp.foodprices.country.wfp_food import WFPFood
-from hdx.scraper.wfp.foodprices.utilities import get_now, setup_currency
+from hdx.scraper.wfp.foodprices.upload_manifest import UploadManifest
+from hdx.scraper.wfp.foodprices.utilities import (
+    get_now,
+    progress_storing_pool,
+    setup_currency,
+)
+from hdx.scraper.wfp.foodprices.wfp_api import ThrottledWFPAPI
 from hdx.scraper.wfp.foodprices.wfp_mappings import WFPMappings
 
 setup_logging()
@@ -33,6 +41,7 @@ logger = logging.getLogger(__name__)
 
 lookup = "hdx-scraper-wfp-foodprices"
 updated_by_script = "HDX Scraper: WFP Food Prices"
+rate_limit = {"calls": 1, "period": 0.1}
 
 
 def main(
@@ -40,6 +49,10 @@ def main(
     use_saved: bool = False,
     countryiso3s: str = "",
     save_wfp_rates: bool = True,
+    workers: int = 1,
+    previous_folder: str = "",
+    manifest: str = "",
+    fx_history: str = "",
 ) -> None:
     """Generate datasets and create them in HDX
 
@@ -47,7 +60,11 @@ def main(
         save (bool): Save all downloaded data. Defaults to False.
         use_saved (bool): Use saved data. Defaults to False.
         countryiso3s (str): Whether to limit to specific countries. Defaults to not limiting ("").
-        save_wfp_rates (bool): Save WFP FX rates data. Defaults to True.
+        save_wfp_rates (bool): Save WFP currencies and FX rates for reuse. Defaults to True.
+        workers (int): Number of countries to process concurrently. Defaults to 1.
+        previous_folder (str): Folder in which prices are kept between runs to refresh incrementally. Defaults to "" (full refresh).
+        manifest (str): Path of manifest used to skip unchanged datasets. Defaults to "" (always update).
+        fx_history (str): Path of WFP FX rates kept between runs and refreshed incrementally. Defaults to "" (download all).
 
     Returns:
         None
@@ -57,7 +74,7 @@ def main(
         "3ecac442-7fed-448d-8f78-b385ef6f84e7", "create_dataset"
     ):
         raise PermissionError("API Token does not give access to WFP organisation!")
-    with Download(use_env=False, rate_limit={"calls": 1, "period": 0.1}) as downloader:
+    with Download(use_env=False, rate_limit=rate_limit) as downloader:
         delete_if_exists = False
         wheretostart = getenv("WHERETOSTART")
         if wheretostart:
@@ -85,7 +102,7 @@ def main(
             )
             configuration.update(load_yaml(base_configuration))
             now = get_now(retriever)
-            wfp_api = WFPAPI(retriever)
+            wfp_api = ThrottledWFPAPI(retriever, rate_limit)
             wfp_api.update_retry_params(attempts=5, wait=1800)
             wfp_mapping = WFPMappings(configuration, wfp_api, retriever)
             iso3_to_showcase_url = wfp_mapping.read_region_mapping()
@@ -97,7 +114,14 @@ def main(
                 wfp_rates_folder = folder
             else:
                 wfp_rates_folder = None
-            currencies = setup_currency(now, retriever, wfp_api, wfp_rates_folder)
+            currencies = setup_currency(
+                now,
+                retriever,
+                wfp_api,
+                wfp_rates_folder,
+                fx_history,
+                configuration["fx_revision_days"],
+            )
             dataset_generator = DatasetGenerator(
                 configuration,
                 folder,
@@ -106,13 +130,24 @@ def main(
                 currencies,
             )
 
-            for _, country in progress_storing_folder(info, countries, "iso3"):
+            if previous_folder:
+                makedirs(previous_folder, exist_ok=True)
+                refresh_start_date = datetime(
+                    now.year, now.month, 1, tzinfo=UTC
+                ) - relativedelta(months=configuration["incremental_months"])
+                logger.info(
+                    f"Refreshing prices from {refresh_start_date.date()} where previous prices exist"
+                )
+
+            def generate_dataset(
+                country: dict,
+            ) -> tuple[Dataset | None, Showcase | None]:
                 countryiso3 = country["iso3"]
                 dataset, showcase = dataset_generator.get_dataset_and_showcase(
                     countryiso3
                 )
                 if not dataset:
-                    continue
+                    return None, None
                 wfp_food = WFPFood(
                     countryiso3,
                     configuration,
@@ -120,9 +155,14 @@ def main(
                     iso3_to_source.get(countryiso3),
                     commodity_to_category,
                 )
-                success = wfp_food.get_price_markets(wfp_api)
+                start_date = None
+                if previous_folder and wfp_food.read_previous_prices(
+                    downloader, previous_folder, refresh_start_date
+                ):
+                    start_date = refresh_start_date
+                success = wfp_food.get_price_markets(wfp_api, start_date)
                 if not success:
-                    continue
+                    return None, None
                 prices_info, markets, sources = wfp_food.generate_rows()
                 dataset = dataset_generator.complete_dataset(
                     countryiso3,
@@ -131,7 +171,14 @@ def main(
                     markets,
                     sources,
                 )
+                if previous_folder:
+                    wfp_food.save_state(folder, previous_folder)
+                return dataset, showcase
 
+            upload_manifest = UploadManifest(manifest)
+            for _, country, (dataset, showcase) in progress_storing_pool(
+                info, countries, "iso3", generate_dataset, workers
+            ):
                 snippet = f"Food Prices data for {country['name']}"
                 if not dataset:
                     continue
@@ -143,16 +190,15 @@ def main(
                     )
                 )
                 dataset["notes"] = dataset["notes"] % snippet
-                dataset.create_in_hdx(
+                upload_manifest.create_in_hdx(
+                    dataset,
+                    showcase,
                     remove_additional_resources=True,
                     match_resource_order=True,
                     updated_by_script=updated_by_script,
                     batch=batch,
                 )
-                if showcase:
-                    showcase.create_in_hdx()
-                    showcase.add_dataset(dataset)
-                else:
+                if not showcase:
                     logger.info(f"{country['name']} does not have a showcase!")
 
 
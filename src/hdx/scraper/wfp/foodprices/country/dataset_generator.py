@@ -1,14 +1,17 @@
 import logging
+from collections.abc import Iterable, Iterator
+from os.path import join
 
 from hdx.api.configuration import Configuration
 from hdx.data.dataset import Dataset
 from hdx.data.hdxobject import HDXError
+from hdx.data.resource import Resource
 from hdx.data.showcase import Showcase
 from hdx.location.country import Country
-from hdx.utilities.text import number_format
 from slugify import slugify
 
-from hdx.scraper.wfp.foodprices.utilities import round_min_digits
+from hdx.scraper.wfp.foodprices.formatting import format_number, round_min_digits
+from hdx.scraper.wfp.foodprices.utilities import write_csv
 
 logger = logging.getLogger(__name__)
 
@@ -70,6 +73,37 @@ class DatasetGenerator:
         showcase.add_tags(tags)
         return dataset, showcase
 
+    def generate_resource(
+        self,
+        dataset: Dataset,
+        filename: str,
+        rows: Iterable[dict],
+        resourcedata: dict,
+        headers: list[str],
+    ) -> bool:
+        """Write rows to a csv file in the folder as they are generated and add
+        a resource for the file to the dataset.
+
+        Args:
+            dataset: Dataset to which to add resource
+            filename: Filename of file to write rows
+            rows: Iterable of rows in dict form
+            resourcedata: Resource data
+            headers: Headers to write
+
+        Returns:
+            True if resource added, False if not
+        """
+        filepath = join(self._folder, filename)
+        if not write_csv(filepath, headers, rows):
+            logger.error(f"No data rows in {filename}!")
+            return False
+        resource = Resource(resourcedata)
+        resource.set_format("csv")
+        resource.set_file_to_upload(filepath)
+        dataset.add_update_resource(resource)
+        return True
+
     def complete_dataset(
         self,
         countryiso3: str,
@@ -94,31 +128,30 @@ class DatasetGenerator:
             "format": "csv",
         }
         prices_headers = self._configuration["prices_headers"]
-        rows = []
-        prices = prices_info["prices"]
-        for key in sorted(prices):
-            (
-                priceflag,
-                date_str,
-                adm1,
-                adm2,
-                market_name,
-                category,
-                commodity,
-                unit,
-                pricetype,
-            ) = key
-            (
-                market_id,
-                lat,
-                lon,
-                commodity_id,
-                currency,
-                price,
-                usdprice,
-            ) = prices[key]
-            rows.append(
-                {
+
+        def get_prices_rows() -> Iterator[dict]:
+            for key, values in prices_info["prices"].iterate_sorted():
+                (
+                    priceflag,
+                    date_str,
+                    adm1,
+                    adm2,
+                    market_name,
+                    category,
+                    commodity,
+                    unit,
+                    pricetype,
+                ) = key
+                (
+                    market_id,
+                    lat,
+                    lon,
+                    commodity_id,
+                    currency,
+                    price,
+                    usdprice,
+                ) = values
+                yield {
                     "date": date_str,
                     "admin1": adm1,
                     "admin2": adm2,
@@ -133,16 +166,16 @@ class DatasetGenerator:
                     "priceflag": priceflag,
                     "pricetype": pricetype,
                     "currency": currency,
-                    "price": number_format(price, format="%.2f", trailing_zeros=False),
+                    "price": format_number(price),
                     "usdprice": round_min_digits(usdprice),
                 }
-            )
-        dataset.generate_resource(
-            self._folder,
+
+        self.generate_resource(
+            dataset,
             filename,
-            rows,
+            get_prices_rows(),
             resourcedata,
-            headers=prices_headers,
+            prices_headers,
         )
 
         filename = f"wfp_markets_{countryiso3_lower}.csv"
@@ -152,11 +185,11 @@ class DatasetGenerator:
             "format": "csv",
         }
         markets_headers = self._configuration["markets_headers"]
-        rows = []
-        for market_id in sorted(markets):
-            market_name, adm1, adm2, lat, lon = markets[market_id]
-            rows.append(
-                {
+
+        def get_markets_rows() -> Iterator[dict]:
+            for market_id in sorted(markets):
+                market_name, adm1, adm2, lat, lon = markets[market_id]
+                yield {
                     "market_id": market_id,
                     "market": market_name,
                     "countryiso3": countryiso3,
@@ -165,12 +198,12 @@ class DatasetGenerator:
                     "latitude": lat,
                     "longitude": lon,
                 }
-            )
-        dataset.generate_resource(
-            self._folder,
+
+        self.generate_resource(
+            dataset,
             filename,
-            rows,
+            get_markets_rows(),
             resourcedata,
-            headers=markets_headers,
+            markets_headers,
         )
         return dataset
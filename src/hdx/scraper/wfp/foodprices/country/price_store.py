@@ -0,0 +1,189 @@
+from array import array
+from collections.abc import Iterator
+from math import isnan, nan
+
+# Each field of the price key is dictionary encoded and the codes are packed
+# into one int which is used in the hash index
+CODE_BITS = 32
+
+
+class StringPool:
+    """Dictionary encoding of a column of repeated strings"""
+
+    def __init__(self):
+        self._codes = {}
+        self._values = []
+
+    def __len__(self) -> int:
+        return len(self._values)
+
+    def encode(self, value: str) -> int:
+        code = self._codes.get(value)
+        if code is None:
+            code = len(self._values)
+            self._codes[value] = code
+            self._values.append(value)
+        return code
+
+    def decode(self, code: int) -> str:
+        return self._values[code]
+
+    def get_values(self) -> list[str]:
+        return self._values
+
+    def get_ranks(self) -> list[int]:
+        """Get the position of each string in sorted order indexed by code so
+        that comparing ranks is the same as comparing strings.
+
+        Returns:
+            List of ranks
+        """
+        ranks = [0] * len(self._values)
+        order = sorted(range(len(self._values)), key=self._values.__getitem__)
+        for rank, code in enumerate(order):
+            ranks[code] = rank
+        return ranks
+
+
+class PriceStore:
+    """Compact store of deduplicated price rows. The string fields of the key
+    (priceflag, date, admin1, admin2, market, category, commodity, unit,
+    pricetype) and the latitude, longitude and currency are dictionary encoded.
+    Numeric fields are held in arrays. A row is looked up by its packed key
+    codes.
+    """
+
+    no_key_fields = 9
+
+    def __init__(self):
+        self._key_pools = [StringPool() for _ in range(self.no_key_fields)]
+        self._index = {}
+        self._keys = []
+        self._coordinates = StringPool()
+        self._currencies = StringPool()
+        self._market_ids = array("q")
+        self._lats = array("l")
+        self._lons = array("l")
+        self._commodity_ids = array("q")
+        self._currency_codes = array("l")
+        self._prices = array("d")
+        self._usdprices = array("d")
+
+    def __len__(self) -> int:
+        return len(self._keys)
+
+    def __bool__(self) -> bool:
+        return len(self._keys) != 0
+
+    def _pack_key(self, key: tuple) -> int:
+        packed = 0
+        for pool, value in zip(self._key_pools, key):
+            packed = packed << CODE_BITS | pool.encode(value)
+        return packed
+
+    def _unpack_key(self, packed: int) -> tuple:
+        mask = (1 << CODE_BITS) - 1
+        codes = []
+        for _ in range(self.no_key_fields):
+            codes.append(packed & mask)
+            packed >>= CODE_BITS
+        return tuple(
+            pool.decode(code) for pool, code in zip(self._key_pools, reversed(codes))
+        )
+
+    def add(
+        self,
+        key: tuple,
+        market_id: int,
+        lat: str,
+        lon: str,
+        commodity_id: int,
+        currency: str,
+        price: float,
+        usdprice: float | None = None,
+    ) -> int | None:
+        """Add a price row unless one already exists with the same key.
+
+        Args:
+            key: Tuple of priceflag, date, admin1, admin2, market, category, commodity, unit, pricetype
+            market_id: Market id
+            lat: Market latitude
+            lon: Market longitude
+            commodity_id: Commodity id
+            currency: Currency
+            price: Price in currency
+            usdprice: Price in USD. Defaults to None.
+
+        Returns:
+            Index of added row or None if the key already exists
+        """
+        packed = self._pack_key(key)
+        if packed in self._index:
+            return None
+        row = len(self._keys)
+        self._index[packed] = row
+        self._keys.append(packed)
+        self._market_ids.append(market_id)
+        self._lats.append(self._coordinates.encode(lat))
+        self._lons.append(self._coordinates.encode(lon))
+        self._commodity_ids.append(commodity_id)
+        self._currency_codes.append(self._currencies.encode(currency))
+        self._prices.append(price)
+        self._usdprices.append(nan if usdprice is None else usdprice)
+        return row
+
+    def get_price(self, row: int) -> float:
+        return self._prices[row]
+
+    def set_usdprice(self, row: int, usdprice: float | None) -> None:
+        self._usdprices[row] = nan if usdprice is None else usdprice
+
+    def get_dates(self) -> list[str]:
+        """Get the distinct dates of the price rows.
+
+        Returns:
+            List of dates as strings
+        """
+        return self._key_pools[1].get_values()
+
+    def get_row(self, row: int) -> tuple[tuple, tuple]:
+        """Get the key and values of a price row.
+
+        Args:
+            row: Index of row
+
+        Returns:
+            Tuple of key and (market_id, lat, lon, commodity_id, currency, price, usdprice)
+        """
+        usdprice = self._usdprices[row]
+        return self._unpack_key(self._keys[row]), (
+            self._market_ids[row],
+            self._coordinates.decode(self._lats[row]),
+            self._coordinates.decode(self._lons[row]),
+            self._commodity_ids[row],
+            self._currencies.decode(self._currency_codes[row]),
+            self._prices[row],
+            None if isnan(usdprice) else usdprice,
+        )
+
+    def iterate_sorted(self) -> Iterator[tuple[tuple, tuple]]:
+        """Iterate over the price rows in key order.
+
+        Returns:
+            Iterator of key and (market_id, lat, lon, commodity_id, currency, price, usdprice)
+        """
+        ranks = [pool.get_ranks() for pool in self._key_pools]
+        mask = (1 << CODE_BITS) - 1
+        shifts = [
+            CODE_BITS * (self.no_key_fields - 1 - i) for i in range(self.no_key_fields)
+        ]
+
+        def sort_key(row: int) -> int:
+            packed = self._keys[row]
+            ranked = 0
+            for field_ranks, shift in zip(ranks, shifts):
+                ranked = ranked << CODE_BITS | field_ranks[packed >> shift & mask]
+            return ranked
+
+        for row in sorted(range(len(self._keys)), key=sort_key):
+            yield self.get_row(row)
@@ -1,45 +1,108 @@
 import re
+from collections.abc import Iterable
 from difflib import SequenceMatcher
 
 from hdx.utilities.matching import multiple_replace
 
+# Two strings can only have a SequenceMatcher ratio above 0.9 if the shorter is
+# more than 9/11 of the length of the longer
+MIN_LENGTH_RATIO = 0.9 / 1.1
 
-def match_source(sources: list[str], source: str) -> bool:
+
+def match_source(sources: Iterable[str], source: str) -> bool:
     words = source.split(" ")
     if len(words) < 2:
         return False
-    found = False
     for cursource in sources:
         words = cursource.split(" ")
         if len(words) < 2:
             continue
         seq = SequenceMatcher(None, source, cursource)
-        if seq.ratio() > 0.9:
-            found = True
-    return found
-
-
-def process_source(sources: dict, orig_source: str):
-    replacements = {"M/o": "Ministry of", "+": "/"}
-    orig_source = multiple_replace(orig_source, replacements)
-    regex = r"Government.*,(Ministry.*)"
-    match = re.search(regex, orig_source)
-    if match:
-        split_sources = [match.group(1)]
-    else:
-        replacements = {",": "/", ";": "/"}
-        split_sources = multiple_replace(orig_source, replacements).split("/")
-    for source in split_sources:
-        source = source.strip()
-        if not source:
-            continue
-        if source[-1] == ".":
-            source = source[:-1]
-        source_lower = source.lower()
-        if "mvam" in source_lower and len(source_lower) <= 8:
-            source = "WFP mVAM"
-        elif "?stica" in source:
-            source = source.replace("?stica", "ística")
-        source_lower = source.lower()
-        if not match_source(sources.keys(), source_lower):
-            sources[source_lower] = source
+        if (
+            seq.real_quick_ratio() > 0.9
+            and seq.quick_ratio() > 0.9
+            and seq.ratio() > 0.9
+        ):
+            return True
+    return False
+
+
+class SourceProcessor:
+    """Normalises WFP source names into a dictionary of lower case source to
+    source. Each distinct raw source string is only split into sources once and
+    the fuzzy matching of sources only compares sources of similar length.
+
+    Args:
+        sources: Dictionary of lower case source to source to add to
+    """
+
+    def __init__(self, sources: dict[str, str]):
+        self._sources = sources
+        self._split_sources = {}
+        self._by_length = {}
+        for source_lower in sources:
+            self._add_to_index(source_lower)
+
+    def _add_to_index(self, source_lower: str) -> None:
+        if len(source_lower.split(" ")) < 2:
+            return
+        self._by_length.setdefault(len(source_lower), []).append(source_lower)
+
+    def _candidates(self, source_lower: str) -> Iterable[str]:
+        length = len(source_lower)
+        for curlength in range(
+            int(length * MIN_LENGTH_RATIO), int(length / MIN_LENGTH_RATIO) + 2
+        ):
+            yield from self._by_length.get(curlength, ())
+
+    def get_sources(self) -> dict[str, str]:
+        return self._sources
+
+    def process(self, orig_source: str) -> None:
+        """Split the raw source into its constituent sources and add those not
+        already present (allowing for small differences in spelling).
+
+        Args:
+            orig_source: Raw source string from WFP
+
+        Returns:
+            None
+        """
+        split_sources = self._split_sources.get(orig_source)
+        if split_sources is None:
+            split_sources = self._split(orig_source)
+            self._split_sources[orig_source] = split_sources
+        for source_lower, source in split_sources:
+            # A multi word source that is already present matches itself
+            if source_lower in self._by_length.get(len(source_lower), ()):
+                continue
+            if not match_source(self._candidates(source_lower), source_lower):
+                if source_lower not in self._sources:
+                    self._add_to_index(source_lower)
+                self._sources[source_lower] = source
+
+    @staticmethod
+    def _split(orig_source: str) -> list[tuple[str, str]]:
+        replacements = {"M/o": "Ministry of", "+": "/"}
+        orig_source = multiple_replace(orig_source, replacements)
+        regex = r"Government.*,(Ministry.*)"
+        match = re.search(regex, orig_source)
+        if match:
+            split_sources = [match.group(1)]
+        else:
+            replacements = {",": "/", ";": "/"}
+            split_sources = multiple_replace(orig_source, replacements).split("/")
+        sources = []
+        for source in split_sources:
+            source = source.strip()
+            if not source:
+                continue
+            if source[-1] == ".":
+                source = source[:-1]
+            source_lower = source.lower()
+            if "mvam" in source_lower and len(source_lower) <= 8:
+                source = "WFP mVAM"
+            elif "?stica" in source:
+                source = source.replace("?stica", "ística")
+            sources.append((source.lower(), source))
+        return sources
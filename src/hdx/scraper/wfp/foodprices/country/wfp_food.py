@@ -1,17 +1,25 @@
 import logging
-from datetime import UTC
+from datetime import UTC, datetime
+from os.path import exists, join
+from shutil import copyfile
 
 from hdx.api.configuration import Configuration
-from hdx.location.currency import Currency, CurrencyError
+from hdx.location.currency import CurrencyError
 from hdx.location.wfp_api import WFPAPI
 from hdx.utilities.dateparse import (
     default_date,
     default_enddate,
     iso_string_from_datetime,
+    parse_date,
 )
-from hdx.utilities.text import number_format
+from hdx.utilities.downloader import Download
+from hdx.utilities.loader import load_yaml
+from hdx.utilities.saver import save_yaml
 
-from hdx.scraper.wfp.foodprices.country.source_processing import process_source
+from hdx.scraper.wfp.foodprices.country.price_store import PriceStore
+from hdx.scraper.wfp.foodprices.country.source_processing import SourceProcessor
+from hdx.scraper.wfp.foodprices.formatting import format_number
+from hdx.scraper.wfp.foodprices.fx_index import FXIndex
 
 logger = logging.getLogger(__name__)
 
@@ -32,10 +40,106 @@ class WFPFood:
         self._commodity_to_category = commodity_to_category
         self._prices_data = []
         self._markets = {}
+        self._prices = PriceStore()
+        self._sources = {}
+        self._fx_rates = {}
+        self.fx_cache_hits = 0
+        self.fx_cache_misses = 0
 
-    def get_price_markets(self, wfp_api: WFPAPI) -> bool:
-        prices_data = wfp_api.get_market_prices_monthly(countryiso3=self._countryiso3)
-        if not prices_data:
+    def get_prices_filename(self) -> str:
+        return f"wfp_food_prices_{self._countryiso3.lower()}.csv"
+
+    def get_sources_filename(self) -> str:
+        return f"wfp_sources_{self._countryiso3.lower()}.yaml"
+
+    def read_previous_prices(
+        self, downloader: Download, folder: str, start_date: datetime
+    ) -> bool:
+        """Read the prices and sources kept by a previous run in folder,
+        keeping only prices dated before start_date. Prices from start_date
+        onwards are then requested from the WFP API by get_price_markets and
+        merged in by generate_rows.
+
+        Args:
+            downloader: Download object to read previous prices file
+            folder: Folder in which previous prices and sources files are kept
+            start_date: Date from which prices will be refreshed
+
+        Returns:
+            True if previous prices and sources were read, False if not
+        """
+        prices_path = join(folder, self.get_prices_filename())
+        sources_path = join(folder, self.get_sources_filename())
+        if not exists(prices_path) or not exists(sources_path):
+            logger.info(f"{self._countryiso3} has no previous prices!")
+            return False
+        start_date_str = iso_string_from_datetime(start_date)
+        _, iterator = downloader.get_tabular_rows(
+            prices_path, dict_form=True, encoding="utf-8"
+        )
+        for row in iterator:
+            date_str = row["date"]
+            if date_str >= start_date_str:
+                continue
+            market_id = int(row["market_id"])
+            market_name = row["market"]
+            adm1 = row["admin1"] or ""
+            adm2 = row["admin2"] or ""
+            lat = row["latitude"] or ""
+            lon = row["longitude"] or ""
+            key = (
+                row["priceflag"],
+                date_str,
+                adm1,
+                adm2,
+                market_name,
+                row["category"],
+                row["commodity"],
+                row["unit"],
+                row["pricetype"],
+            )
+            usdprice = row["usdprice"]
+            self._prices.add(
+                key,
+                market_id,
+                lat,
+                lon,
+                int(row["commodity_id"]),
+                row["currency"],
+                float(row["price"]),
+                float(usdprice) if usdprice else None,
+            )
+            if market_id not in self._markets:
+                self._markets[market_id] = market_name, adm1, adm2, lat, lon
+        self._sources = load_yaml(sources_path)
+        logger.info(f"{len(self._prices)} previous prices rows before {start_date_str}")
+        return True
+
+    def save_state(self, folder: str, state_folder: str) -> None:
+        """Keep the prices file written to folder and the sources in the state
+        folder so that the next run can read them with read_previous_prices.
+
+        Args:
+            folder: Folder containing prices file
+            state_folder: Folder in which to keep prices and sources files
+
+        Returns:
+            None
+        """
+        prices_filename = self.get_prices_filename()
+        copyfile(join(folder, prices_filename), join(state_folder, prices_filename))
+        save_yaml(self._sources, join(state_folder, self.get_sources_filename()))
+
+    def get_price_markets(
+        self, wfp_api: WFPAPI, start_date: datetime | None = None
+    ) -> bool:
+        kwargs = {}
+        if start_date:
+            kwargs["start_date"] = start_date
+        prices_data = wfp_api.get_market_prices_monthly(
+            countryiso3=self._countryiso3, **kwargs
+        )
+        if not prices_data and not self._prices:
             logger.info(f"{self._countryiso3} has no prices data!")
             return False
         self._prices_data = prices_data
@@ -50,19 +154,87 @@ class WFPFood:
                 market_name,
                 admin1,
                 admin2,
-                number_format(latitude, format="%.2f", trailing_zeros=False),
-                number_format(longitude, format="%.2f", trailing_zeros=False),
+                format_number(latitude),
+                format_number(longitude),
             )
         logger.info(f"{len(prices_data)} prices rows")
         return True
 
+    def get_usd_rate(self, currency: str, date: datetime) -> float | None:
+        """Get the fx rate to convert from currency to USD on date. Rates are
+        cached including those that are missing.
+
+        Args:
+            currency: Currency
+            date: Date to use for fx conversion
+
+        Returns:
+            fx rate or None if there is no rate
+        """
+        cache_key = (currency, date)
+        if cache_key in self._fx_rates:
+            self.fx_cache_hits += 1
+            return self._fx_rates[cache_key]
+        self.fx_cache_misses += 1
+        try:
+            fx_rate = FXIndex.get_historic_rate(currency, date)
+        except CurrencyError:
+            fx_rate = None
+        if not fx_rate:
+            fx_rate = None
+        self._fx_rates[cache_key] = fx_rate
+        return fx_rate
+
+    def convert_to_usd(self, prices: PriceStore, to_convert: dict) -> None:
+        """Fill in the USD prices of the given price rows. The fx rate for each
+        currency and date is looked up once and applied to all the price rows
+        with that currency and date.
+
+        Args:
+            prices: Store of price rows
+            to_convert: Dictionary of (currency, date) to price rows to convert
+
+        Returns:
+            None
+        """
+        no_rows = 0
+        no_lookups = 0
+        no_missing = 0
+        hits = self.fx_cache_hits
+        misses = self.fx_cache_misses
+        for (currency, date), rows in to_convert.items():
+            if currency.upper() == "USD":
+                for row in rows:
+                    prices.set_usdprice(row, prices.get_price(row))
+                continue
+            no_rows += len(rows)
+            no_lookups += 1
+            fx_rate = self.get_usd_rate(currency, date)
+            if fx_rate is None:
+                no_missing += len(rows)
+                continue
+            for row in rows:
+                prices.set_usdprice(row, prices.get_price(row) / fx_rate)
+        if no_rows:
+            logger.info(
+                f"USD conversion of {no_rows} prices with {no_lookups} fx rate "
+                f"lookups: cache hits {self.fx_cache_hits - hits}, misses "
+                f"{self.fx_cache_misses - misses}, prices with no rate {no_missing}"
+            )
+
     def generate_rows(self) -> tuple[dict, dict, dict]:
         prices_info = {}
-        prices = {}
+        prices = self._prices
         prices_info["prices"] = prices
-        sources = {}
+        sources = self._sources
+        source_processor = SourceProcessor(sources)
         start_date = default_enddate
         end_date = default_date
+        if prices:
+            dates = sorted(prices.get_dates())
+            start_date = parse_date(dates[0])
+            end_date = parse_date(dates[-1])
+        to_convert = {}
         for price_data in self._prices_data:
             priceflag = price_data.commodity_price_flag
             if not all(x in ("actual", "aggregate") for x in priceflag.split(",")):
@@ -78,7 +250,7 @@ class WFPFood:
                 market_name = price_data.market_name
                 self._markets[market_id] = market_name, adm1, adm2, lat, lon
 
-            process_source(sources, price_data.commodity_price_source_name)
+            source_processor.process(price_data.commodity_price_source_name)
             date = price_data.commodity_price_date
             if date.tzinfo is None:
                 # data_bridges_client parses WFP's timezone-less date strings
@@ -96,10 +268,6 @@ class WFPFood:
             price = price_data.commodity_price
             currency = price_data.currency_name
             currency = self._configuration["currency_mappings"].get(currency, currency)
-            try:
-                usdprice = Currency.get_historic_value_in_usd(price, currency, date)
-            except (CurrencyError, ZeroDivisionError):
-                usdprice = None
             key = (
                 priceflag,
                 date_str,
@@ -111,16 +279,12 @@ class WFPFood:
                 unit,
                 pricetype,
             )
-            if key not in prices:
-                prices[key] = (
-                    market_id,
-                    lat,
-                    lon,
-                    commodity_id,
-                    currency,
-                    price,
-                    usdprice,
-                )
+            row = prices.add(key, market_id, lat, lon, commodity_id, currency, price)
+            if row is not None:
+                to_convert.setdefault((currency, date), []).append(row)
+        # The API objects are no longer needed once they are in the price store
+        self._prices_data = []
+        self.convert_to_usd(prices, to_convert)
         if prices:
             logger.info(
                 f"{len(prices)} unique prices rows of price type actual or aggregate"
@@ -0,0 +1,65 @@
+from functools import lru_cache
+from typing import Any
+
+from sigfig import round
+
+memo_size = 65536
+
+
+def _format_number(val: Any) -> str:
+    return f"{float(val):.2f}".rstrip("0").rstrip(".")
+
+
+def _round_min_digits(val: Any) -> str:
+    num_str = f"{val:.2f}"
+    if num_str[-3] == ".":
+        # Number of non zero digits ignoring the decimal point and sign
+        count = len(num_str) - num_str.count("0") - (2 if num_str[0] == "-" else 1)
+    else:
+        # inf or nan
+        count = 0
+    if count < 2:
+        num_str = round(val, sigfigs=2, type=str, warn=False)
+    return num_str.rstrip("0").rstrip(".")
+
+
+# The same prices and coordinates recur many times so the string for each
+# distinct value is memoized. Zero is not as 0.0 and -0.0 are equal but format
+# differently.
+_format_number_memo = lru_cache(maxsize=memo_size, typed=True)(_format_number)
+_round_min_digits_memo = lru_cache(maxsize=memo_size, typed=True)(_round_min_digits)
+
+
+def format_number(val: Any) -> str:
+    """Format a number to 2 decimal places without trailing zeros. This is the
+    same as number_format(val, format="%.2f", trailing_zeros=False).
+
+    Args:
+        val: Number to format
+
+    Returns:
+        Formatted number
+    """
+    if val == "" or val is None:
+        return ""
+    if val == 0:
+        return _format_number(val)
+    return _format_number_memo(val)
+
+
+def round_min_digits(val: Any, nonevalue: str | None = "") -> str | None:
+    """Format a number to 2 decimal places, or to 2 significant figures if that
+    gives fewer than 2 non zero digits, without trailing zeros.
+
+    Args:
+        val: Number to format
+        nonevalue: Value to return for empty input. Defaults to "".
+
+    Returns:
+        Formatted number
+    """
+    if val == "" or val is None:
+        return nonevalue
+    if val == 0:
+        return _round_min_digits(val)
+    return _round_min_digits_memo(val)
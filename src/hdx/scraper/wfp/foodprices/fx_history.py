@@ -0,0 +1,106 @@
+import logging
+from collections.abc import Sequence
+from datetime import UTC, datetime
+
+from data_bridges_client.models.usd_indirect_quotation import UsdIndirectQuotation
+from hdx.location.int_timestamp import get_int_timestamp
+from hdx.location.wfp_exchangerates import WFPExchangeRates
+
+from hdx.scraper.wfp.foodprices.wfp_api import ThrottledWFPAPI
+
+logger = logging.getLogger(__name__)
+
+
+class IncrementalWFPExchangeRates(WFPExchangeRates):
+    """Obtain WFP official exchange rates, refreshing previously obtained
+    historic rates rather than downloading the full history of every currency.
+    The WFP API returns the quotations of a currency newest first, so for a
+    currency with cached rates, pages are read only until they reach the
+    last cached date less a revision window. Cached rates in the revision
+    window are replaced by the downloaded ones so that revised rates are
+    picked up unless no official rates are downloaded, in which case the
+    cached rates are kept.
+
+    Args:
+        wfp_api: ThrottledWFPAPI object
+        revision_days: Number of days before last cached rate to download again. Defaults to 92.
+    """
+
+    def __init__(self, wfp_api: ThrottledWFPAPI, revision_days: int = 92):
+        super().__init__(wfp_api)
+        self._revision_seconds = revision_days * 86400
+
+    @staticmethod
+    def _get_timestamp(quote: UsdIndirectQuotation) -> int:
+        date = quote.var_date
+        if date.tzinfo is None:
+            date = date.replace(tzinfo=UTC)
+        return get_int_timestamp(date)
+
+    def get_currency_historic_rates_since(
+        self, currency: str, since: int
+    ) -> dict[int, float]:
+        """Get historic rates for currency from WFP API from a timestamp
+        onwards.
+
+        Args:
+            currency: Currency
+            since: Timestamp from which to get rates
+
+        Returns:
+            Mapping from timestamp to rate
+        """
+        quotes = self.wfp_api.get_currency_usd_indirect_quotations_since(
+            currency, datetime.fromtimestamp(since, UTC)
+        )
+        historic_rates = {}
+        for quote in quotes:
+            if quote.is_official:
+                historic_rates[self._get_timestamp(quote)] = quote.value
+        return {
+            timestamp: historic_rates[timestamp] for timestamp in sorted(historic_rates)
+        }
+
+    def refresh_historic_rates(
+        self,
+        cached_rates: dict[str, dict[int, float]],
+        currencies: Sequence[str],
+    ) -> dict[str, dict[int, float]]:
+        """Get historic rates for a list of currencies from WFP API, only
+        getting the rates from the revision window onwards for currencies in
+        the cached rates. Currencies not in the list are dropped.
+
+        Args:
+            cached_rates: Mapping from currency to mapping from timestamp to rate
+            currencies: List of currencies
+
+        Returns:
+            Mapping from currency to mapping from timestamp to rate
+        """
+        historic_rates = {}
+        no_refreshed = 0
+        for currency in currencies:
+            currency = currency.upper()
+            currency_rates = cached_rates.get(currency)
+            if not currency_rates:
+                logger.info(f"Getting WFP historic rates for {currency}")
+                historic_rates[currency] = self.get_currency_historic_rates(currency)
+                continue
+            since = max(currency_rates) - self._revision_seconds
+            logger.info(f"Refreshing WFP historic rates for {currency}")
+            new_rates = self.get_currency_historic_rates_since(currency, since)
+            if not new_rates:
+                historic_rates[currency] = currency_rates
+                continue
+            rates = {
+                timestamp: currency_rates[timestamp]
+                for timestamp in sorted(currency_rates)
+                if timestamp < since
+            }
+            rates.update(new_rates)
+            historic_rates[currency] = rates
+            no_refreshed += 1
+        logger.info(
+            f"Refreshed WFP historic rates for {no_refreshed} of {len(historic_rates)} currencies"
+        )
+        return historic_rates
@@ -0,0 +1,79 @@
+import logging
+from array import array
+from bisect import bisect_left
+from datetime import UTC, datetime
+
+from hdx.location.currency import Currency
+from hdx.location.int_timestamp import get_int_timestamp
+
+logger = logging.getLogger(__name__)
+
+
+class FXIndex:
+    """Index of the WFP historic FX rates in which the timestamps and rates of
+    each currency are held as parallel sorted arrays so that the rate on a date
+    is found by binary search. Lookups give the same rates as
+    Currency.get_historic_rate when it is set up to use the WFP rates as
+    secondary historic rates: the rate on the date if there is one, otherwise
+    the rate interpolated between the nearest previous and next rates or the
+    nearest rate if the date is before the first or after the last rate.
+    Currencies with no WFP rates are passed to Currency.get_historic_rate so
+    that its fallback rules apply.
+    """
+
+    _timestamps = {}
+    _rates = {}
+
+    @classmethod
+    def setup(cls, historic_rates: dict[str, dict[int, float]]) -> None:
+        """Build the index from the WFP historic rates.
+
+        Args:
+            historic_rates: Mapping from currency to mapping from timestamp to rate
+
+        Returns:
+            None
+        """
+        cls._timestamps = {}
+        cls._rates = {}
+        for currency, rates in historic_rates.items():
+            if not rates:
+                continue
+            timestamps = sorted(rates)
+            cls._timestamps[currency] = array("q", timestamps)
+            cls._rates[currency] = array(
+                "d", (rates[timestamp] for timestamp in timestamps)
+            )
+        logger.info(f"Indexed WFP FX rates for {len(cls._rates)} currencies")
+
+    @classmethod
+    def get_historic_rate(cls, currency: str, date: datetime) -> float:
+        """Get the fx rate for currency on a particular date. Any time and time
+        zone information is ignored.
+
+        Args:
+            currency: Currency
+            date: Date to use for fx conversion
+
+        Returns:
+            fx rate
+        """
+        currency = currency.upper()
+        timestamps = cls._timestamps.get(currency)
+        if timestamps is None:
+            return Currency.get_historic_rate(currency, date)
+        timestamp = get_int_timestamp(
+            date.replace(hour=0, minute=0, second=0, microsecond=0, tzinfo=UTC)
+        )
+        rates = cls._rates[currency]
+        index = bisect_left(timestamps, timestamp)
+        if index == len(timestamps):
+            return rates[-1]
+        timestamp2 = timestamps[index]
+        if timestamp2 == timestamp or index == 0:
+            return rates[index]
+        timestamp1 = timestamps[index - 1]
+        rate1 = rates[index - 1]
+        return rate1 + (timestamp - timestamp1) * (
+            (rates[index] - rate1) / (timestamp2 - timestamp1)
+        )
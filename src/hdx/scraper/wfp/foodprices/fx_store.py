@@ -0,0 +1,129 @@
+import logging
+import sys
+from array import array
+from hashlib import sha256
+from json import dumps, loads
+from os.path import exists
+from struct import Struct
+
+logger = logging.getLogger(__name__)
+
+
+class FXStore:
+    """Binary store of the WFP historic FX rates. For each currency, the
+    timestamps and rates are held as sorted arrays of 64 bit integers and
+    floats which are read back without any parsing. Metadata such as the
+    currency list and when the rates were fetched can be stored with the
+    rates. The file has a header with a format version and a checksum of the
+    contents so that a file from a different version or a truncated file is
+    never used.
+
+    Args:
+        path: Path of store file
+    """
+
+    magic = b"WFPFX"
+    version = 2
+    header = Struct("<5sHII32s")
+    currency_header = Struct("<16sI")
+
+    def __init__(self, path: str):
+        self._path = path
+        self.metadata = {}
+
+    @staticmethod
+    def _to_little_endian(values: array) -> array:
+        if sys.byteorder != "little":
+            values.byteswap()
+        return values
+
+    def load(self) -> dict[str, dict[int, float]] | None:
+        """Load the historic rates from the store if it exists and is valid.
+        The rates of each currency are in timestamp order. Any metadata stored
+        with the rates is put in the metadata attribute.
+
+        Returns:
+            Mapping from currency to mapping from timestamp to rate or None
+        """
+        if not exists(self._path):
+            return None
+        with open(self._path, "rb") as f:
+            data = f.read()
+        if len(data) < self.header.size:
+            logger.warning(f"Ignoring unreadable FX store {self._path}")
+            return None
+        magic, version, no_currencies, metadata_size, checksum = (
+            self.header.unpack_from(data)
+        )
+        if magic != self.magic or version != self.version:
+            logger.info(f"Ignoring FX store {self._path} with different version")
+            return None
+        contents = memoryview(data)[self.header.size :]
+        if sha256(contents).digest() != checksum:
+            logger.warning(f"Ignoring FX store {self._path} with bad checksum")
+            return None
+        self.metadata = loads(bytes(contents[:metadata_size]))
+        historic_rates = {}
+        offset = metadata_size
+        for _ in range(no_currencies):
+            currency, length = self.currency_header.unpack_from(contents, offset)
+            offset += self.currency_header.size
+            size = length * 8
+            timestamps = array("q")
+            timestamps.frombytes(contents[offset : offset + size])
+            offset += size
+            rates = array("d")
+            rates.frombytes(contents[offset : offset + size])
+            offset += size
+            currency = currency.rstrip(b"\0").decode("ascii")
+            historic_rates[currency] = dict(
+                zip(
+                    self._to_little_endian(timestamps).tolist(),
+                    self._to_little_endian(rates).tolist(),
+                )
+            )
+        logger.info(
+            f"Loaded WFP FX rates for {no_currencies} currencies from {self._path}"
+        )
+        return historic_rates
+
+    def save(
+        self, historic_rates: dict[str, dict[int, float]], metadata: dict | None = None
+    ) -> None:
+        """Save the historic rates and optionally metadata to the store. The
+        rates of each currency are sorted by timestamp.
+
+        Args:
+            historic_rates: Mapping from currency to mapping from timestamp to rate
+            metadata: Metadata in JSON serialisable form. Defaults to None.
+
+        Returns:
+            None
+        """
+        self.metadata = metadata or {}
+        metadata = dumps(self.metadata).encode("utf-8")
+        contents = bytearray(metadata)
+        for currency, rates in historic_rates.items():
+            timestamps = sorted(rates)
+            contents += self.currency_header.pack(
+                currency.encode("ascii"), len(timestamps)
+            )
+            contents += self._to_little_endian(array("q", timestamps)).tobytes()
+            contents += self._to_little_endian(
+                array("d", (rates[timestamp] for timestamp in timestamps))
+            ).tobytes()
+        checksum = sha256(contents).digest()
+        with open(self._path, "wb") as f:
+            f.write(
+                self.header.pack(
+                    self.magic,
+                    self.version,
+                    len(historic_rates),
+                    len(metadata),
+                    checksum,
+                )
+            )
+            f.write(contents)
+        logger.info(
+            f"Saved WFP FX rates for {len(historic_rates)} currencies to {self._path}"
+        )
@@ -0,0 +1,149 @@
+import logging
+from hashlib import sha256
+from json import dumps
+from os.path import exists
+from typing import Any
+
+from hdx.data.dataset import Dataset
+from hdx.data.resource import Resource
+from hdx.data.showcase import Showcase
+from hdx.utilities.file_hashing import get_size_and_hash
+from hdx.utilities.loader import load_json
+from hdx.utilities.saver import save_json
+
+logger = logging.getLogger(__name__)
+
+
+class UploadManifest:
+    """Manifest of the digests of the datasets created in HDX by previous
+    runs. The manifest entry for a dataset holds a digest of the dataset,
+    resource and showcase metadata, the size and hash of the file of each
+    resource and the HDX ids. If a dataset is unchanged since it was last
+    created in HDX, it is not created again and its ids are restored from the
+    manifest. Only the last modified dates of its resources are updated so
+    that HDX still shows the data as up to date. If no path is given, datasets
+    are always created.
+
+    Args:
+        path: Path of manifest file. Defaults to "" (no manifest).
+    """
+
+    version = 1
+
+    def __init__(self, path: str = ""):
+        self._path = path
+        self._datasets = {}
+        self.skipped = 0
+        if not path or not exists(path):
+            return
+        data = load_json(path)
+        if data.get("version") != self.version:
+            logger.info(f"Ignoring upload manifest {path} with different version")
+        else:
+            self._datasets = data["datasets"]
+            logger.info(f"Loaded {len(self._datasets)} datasets from upload manifest")
+
+    @staticmethod
+    def get_digests(dataset: Dataset, showcase: Showcase | None = None) -> dict:
+        """Get the digests of a dataset before it is created in HDX.
+
+        Args:
+            dataset: Dataset
+            showcase: Showcase of dataset. Defaults to None.
+
+        Returns:
+            Dictionary with metadata digest and resource name to size and hash
+        """
+        resources = dataset.get_resources()
+        metadata = [
+            dataset.data,
+            [resource.data for resource in resources],
+            showcase.data if showcase else None,
+        ]
+        digest = sha256(dumps(metadata, sort_keys=True, default=str).encode("utf-8"))
+        files = {}
+        for resource in resources:
+            filepath = resource.get_file_to_upload()
+            if filepath:
+                size, file_hash = get_size_and_hash(
+                    filepath, resource.get_format() or ""
+                )
+                files[resource["name"]] = [size, file_hash]
+        return {"metadata": digest.hexdigest(), "files": files}
+
+    def _is_unchanged(self, dataset: Dataset, digests: dict) -> bool:
+        entry = self._datasets.get(dataset["name"])
+        if not entry:
+            return False
+        if (
+            entry["metadata"] != digests["metadata"]
+            or entry["files"] != digests["files"]
+        ):
+            return False
+        resource_ids = entry["resource_ids"]
+        resources = dataset.get_resources()
+        if any(resource["name"] not in resource_ids for resource in resources):
+            return False
+        dataset["id"] = entry["id"]
+        for resource in resources:
+            resource["id"] = resource_ids[resource["name"]]
+        return True
+
+    @staticmethod
+    def mark_data_updated(dataset: Dataset) -> None:
+        """Set the last modified date of each resource of a dataset in HDX to
+        now without uploading its file or changing any other metadata.
+
+        Args:
+            dataset: Dataset whose resources have HDX ids
+
+        Returns:
+            None
+        """
+        for resource in dataset.get_resources():
+            resource = Resource({"id": resource["id"]})
+            resource.mark_data_updated()
+            resource.update_in_hdx(operation="patch")
+
+    def create_in_hdx(
+        self, dataset: Dataset, showcase: Showcase | None = None, **kwargs: Any
+    ) -> bool:
+        """Create a dataset and optionally its showcase in HDX unless they are
+        unchanged since they were last created. The manifest is saved after
+        each dataset is created.
+
+        Args:
+            dataset: Dataset
+            showcase: Showcase of dataset. Defaults to None.
+            **kwargs: Parameters to pass to dataset create_in_hdx call
+
+        Returns:
+            Whether the dataset was created in HDX
+        """
+        if not self._path:
+            dataset.create_in_hdx(**kwargs)
+            if showcase:
+                showcase.create_in_hdx()
+                showcase.add_dataset(dataset)
+            return True
+        digests = self.get_digests(dataset, showcase)
+        if self._is_unchanged(dataset, digests):
+            logger.info(f"Only marking data updated for unchanged {dataset['name']}")
+            self.mark_data_updated(dataset)
+            self.skipped += 1
+            return False
+        dataset.create_in_hdx(**kwargs)
+        if showcase:
+            showcase.create_in_hdx()
+            showcase.add_dataset(dataset)
+        digests["id"] = dataset["id"]
+        digests["resource_ids"] = {
+            resource["name"]: resource["id"] for resource in dataset.get_resources()
+        }
+        self._datasets[dataset["name"]] = digests
+        self.save()
+        return True
+
+    def save(self) -> None:
+        data = {"version": self.version, "datasets": self._datasets}
+        save_json(data, self._path)
@@ -1,16 +1,27 @@
 import logging
-from datetime import datetime
-from os.path import exists, join
-from typing import Any
+from collections.abc import Callable, Iterable, Iterator, Mapping, Sequence
+from concurrent.futures import ThreadPoolExecutor
+from csv import DictWriter
+from csv import writer as csv_writer
+from datetime import UTC, datetime
+from functools import cache
+from gzip import GzipFile
+from io import TextIOWrapper
+from os.path import join
+from typing import IO, Any
 
 from hdx.location.currency import Currency
 from hdx.location.wfp_api import WFPAPI
 from hdx.location.wfp_exchangerates import WFPExchangeRates
 from hdx.utilities.dateparse import now_utc, parse_date
-from hdx.utilities.loader import load_text, load_yaml
+from hdx.utilities.loader import load_text
+from hdx.utilities.path import progress_storing_folder
 from hdx.utilities.retriever import Retrieve
-from hdx.utilities.saver import save_text, save_yaml
-from sigfig import round
+from hdx.utilities.saver import save_text
+
+from hdx.scraper.wfp.foodprices.fx_history import IncrementalWFPExchangeRates
+from hdx.scraper.wfp.foodprices.fx_index import FXIndex
+from hdx.scraper.wfp.foodprices.fx_store import FXStore
 
 logger = logging.getLogger(__name__)
 
@@ -30,9 +41,30 @@ def get_now(retriever: Retrieve):
     return fixed_now
 
 
-def get_currencies(
-    wfp_api: WFPAPI,
-) -> list[dict]:
+wfp_rates_filename = "wfp_rates.fx"
+
+
+def get_currencies(wfp_api: WFPAPI, folder: str | None = None) -> list[dict]:
+    """Get the WFP currency codes and names sorted by code. If folder has the
+    currency bootstrap saved by setup_currency, the currencies in it are used
+    rather than getting them from the WFP API again.
+
+    Args:
+        wfp_api: WFPAPI object
+        folder: Folder with currency bootstrap. Defaults to None (use WFP API).
+
+    Returns:
+        List of currency codes and names
+    """
+    if folder:
+        fx_store = FXStore(join(folder, wfp_rates_filename))
+        if fx_store.load() is not None:
+            currencies = fx_store.metadata.get("currencies")
+            if currencies:
+                logger.info(
+                    f"Using currencies fetched at {fx_store.metadata['fetched_at']}"
+                )
+                return currencies
     wfp_fx = WFPExchangeRates(wfp_api)
     currencies = wfp_fx.get_currencies_info()
     return sorted(currencies, key=lambda c: c["code"])
@@ -43,21 +75,53 @@ def setup_currency(
     retriever: Retrieve,
     wfp_api: WFPAPI,
     wfp_rates_folder: str | None = None,
+    fx_history_path: str = "",
+    revision_days: int = 92,
 ) -> list[dict]:
-    currencies = get_currencies(wfp_api)
-    currency_codes = [x["code"] for x in currencies]
-    wfp_fx = WFPExchangeRates(wfp_api)
+    """Set up Currency and FXIndex with the WFP historic FX rates. If
+    wfp_rates_folder is given, the currency list, rates and time they were
+    fetched are saved in it as a currency bootstrap that is reused by later
+    country runs and the world run in the same folder. Otherwise, if an FX
+    history store is given, the rates in it are refreshed from the WFP API
+    from the revision window onwards and saved back to it, and if not, all
+    rates are downloaded.
+
+    Args:
+        now: Date to use as now
+        retriever: Retrieve object
+        wfp_api: WFPAPI object
+        wfp_rates_folder: Folder in which to save currency bootstrap. Defaults to None (don't save).
+        fx_history_path: Path of FX history store kept between runs. Defaults to "" (none).
+        revision_days: Number of days of rates to download again. Defaults to 92.
+
+    Returns:
+        List of currency codes and names
+    """
+    fx_store = None
+    wfp_historic_rates = None
+    currencies = None
     if wfp_rates_folder:
-        filepath = join(wfp_rates_folder, "wfp_rates.yaml")
-        if exists(filepath):
-            logger.info(f"Loading WFP FX rates from {filepath}")
-            wfp_historic_rates = load_yaml(filepath)
+        fx_store = FXStore(join(wfp_rates_folder, wfp_rates_filename))
+        wfp_historic_rates = fx_store.load()
+        currencies = fx_store.metadata.get("currencies")
+    if wfp_historic_rates is None or not currencies:
+        currencies = get_currencies(wfp_api)
+        currency_codes = [x["code"] for x in currencies]
+        wfp_fx = IncrementalWFPExchangeRates(wfp_api, revision_days)
+        if fx_history_path:
+            fx_history = FXStore(fx_history_path)
+            cached_rates = fx_history.load() or {}
+            wfp_historic_rates = wfp_fx.refresh_historic_rates(
+                cached_rates, currency_codes
+            )
+            fx_history.save(wfp_historic_rates)
         else:
             wfp_historic_rates = wfp_fx.get_historic_rates(currency_codes)
-            logger.info(f"Saving WFP FX rates to {filepath}")
-            save_yaml(wfp_historic_rates, filepath)
+        if fx_store:
+            metadata = {"currencies": currencies, "fetched_at": now_utc().isoformat()}
+            fx_store.save(wfp_historic_rates, metadata)
     else:
-        wfp_historic_rates = wfp_fx.get_historic_rates(currency_codes)
+        logger.info(f"Using currencies fetched at {fx_store.metadata['fetched_at']}")
     Currency.setup(
         retriever=retriever,
         fallback_historic_to_current=True,
@@ -67,17 +131,140 @@ def setup_currency(
         secondary_historic_rates=wfp_historic_rates,
         use_secondary_historic=True,
     )
+    FXIndex.setup(wfp_historic_rates)
     return currencies
 
 
-def round_min_digits(val: Any, nonevalue: str | None = "") -> str | None:
-    if val == "" or val is None:
-        return nonevalue
-    num_str = f"{val:.2f}"
-    count = 0
-    for digit in num_str:
-        if digit in "123456789":
-            count += 1
-    if count < 2:
-        num_str = round(val, sigfigs=2, type=str, warn=False)
-    return num_str.rstrip("0").rstrip(".")
+def progress_storing_pool(
+    info: dict,
+    iterator: Iterable[dict],
+    key: str,
+    function: Callable[[dict], Any],
+    workers: int = 1,
+) -> Iterator[tuple[dict, dict, Any]]:
+    """Call function on each dictionary in iterator using up to workers threads,
+    yielding the info dictionary, the dictionary and the result in iterator order.
+    Progress is stored by progress_storing_folder as each result is yielded so
+    WHERETOSTART resume behaviour is the same as for a sequential run. At most
+    workers dictionaries are being processed or waiting to be yielded at once.
+
+    Args:
+        info: Dictionary containing folder and anything else to be yielded
+        iterator: Iterate over this object persisting progress
+        key: Key to examine from dictionary from iterator
+        function: Function to call on each dictionary from iterator
+        workers: Number of worker threads. Defaults to 1.
+
+    Returns:
+        A tuple of the form (info dictionary, next object in iterator, result)
+    """
+    if workers <= 1:
+        for info, nextdict in progress_storing_folder(info, iterator, key):
+            yield info, nextdict, function(nextdict)
+        return
+    nextdicts = list(iterator)
+    key_to_index = {nextdict[key]: i for i, nextdict in enumerate(nextdicts)}
+    futures = {}
+    executor = ThreadPoolExecutor(max_workers=workers)
+    try:
+        for info, nextdict in progress_storing_folder(info, nextdicts, key):
+            index = key_to_index[nextdict[key]]
+            for i in range(index, min(index + workers, len(nextdicts))):
+                if i not in futures:
+                    futures[i] = executor.submit(function, nextdicts[i])
+            yield info, nextdict, futures.pop(index).result()
+    finally:
+        executor.shutdown(wait=True, cancel_futures=True)
+
+
+@cache
+def parse_iso_date(date_str: str) -> datetime:
+    """Parse a date in the YYYY-MM-DD form that is output in the prices files
+    into a UTC datetime. This is much faster than parse_date which needs to
+    handle any format and the result for each distinct string is memoized.
+    Other forms are passed to parse_date.
+
+    Args:
+        date_str: Date string
+
+    Returns:
+        Date as datetime
+    """
+    if len(date_str) == 10 and date_str[4] == "-" and date_str[7] == "-":
+        try:
+            return datetime(
+                int(date_str[:4]), int(date_str[5:7]), int(date_str[8:]), tzinfo=UTC
+            )
+        except ValueError:
+            pass
+    return parse_date(date_str)
+
+
+def open_csv(filepath: str, mode: str = "r") -> IO:
+    """Open a csv file for reading or writing. Files with a .gz extension are
+    gzip compressed. The gzip header has no timestamp so that compressing the
+    same rows always gives the same bytes.
+
+    Args:
+        filepath: Path of file
+        mode: "r" to read or "w" to write. Defaults to "r".
+
+    Returns:
+        Text file object
+    """
+    if filepath.endswith(".gz"):
+        file = GzipFile(filepath, f"{mode}b", compresslevel=6, mtime=0)
+        return TextIOWrapper(file, encoding="utf-8", newline="")
+    return open(filepath, mode, encoding="utf-8", newline="", buffering=1048576)
+
+
+def get_csv_format(filepath: str) -> str:
+    """Get the HDX resource format of a csv file written by write_csv or
+    open_csv.
+
+    Args:
+        filepath: Path of file
+
+    Returns:
+        HDX resource format
+    """
+    if filepath.endswith(".gz"):
+        return "gz"
+    return "csv"
+
+
+def write_csv(
+    filepath: str, headers: Sequence[str], rows: Iterable[Mapping | Sequence]
+) -> int:
+    """Write rows to a csv file as they are generated rather than building a
+    list of rows first. The output is the same as that of save_iterable. Rows
+    can be in dict form, in which case keys not in headers are dropped, or in
+    list form, in which case values must be in the order of headers. If there
+    are no rows, no file is written. The file is gzip compressed if the path
+    ends in .gz.
+
+    Args:
+        filepath: Path to write to
+        headers: Headers to write
+        rows: Iterable of rows in dict or list form
+
+    Returns:
+        Number of rows written
+    """
+    rows = iter(rows)
+    row = next(rows, None)
+    if row is None:
+        return 0
+    no_rows = 1
+    with open_csv(filepath, "w") as f:
+        if isinstance(row, Mapping):
+            writer = DictWriter(f, headers, extrasaction="ignore")
+            writer.writeheader()
+        else:
+            writer = csv_writer(f)
+            writer.writerow(headers)
+        writer.writerow(row)
+        for row in rows:
+            writer.writerow(row)
+            no_rows += 1
+    return no_rows
@@ -0,0 +1,175 @@
+import logging
+from collections import deque
+from collections.abc import Callable
+from concurrent.futures import ThreadPoolExecutor
+from datetime import UTC, datetime
+from math import ceil
+from threading import Lock
+from time import monotonic, sleep
+from typing import Any
+
+from data_bridges_client import UsdIndirectQuotationPagedResult
+from data_bridges_client.models.usd_indirect_quotation import UsdIndirectQuotation
+from hdx.location.wfp_api import WFPAPI
+from hdx.utilities.retriever import Retrieve
+
+logger = logging.getLogger(__name__)
+
+
+class RateLimiter:
+    """Thread safe limiter allowing at most calls calls in any period seconds.
+
+    Args:
+        calls: Number of calls allowed per period
+        period: Period in seconds
+    """
+
+    def __init__(self, calls: int, period: float):
+        self._calls = calls
+        self._period = period
+        self._lock = Lock()
+        self._timestamps = deque()
+
+    def wait(self) -> None:
+        with self._lock:
+            now = monotonic()
+            while self._timestamps and now - self._timestamps[0] >= self._period:
+                self._timestamps.popleft()
+            if len(self._timestamps) >= self._calls:
+                sleep(self._period - (now - self._timestamps[0]))
+                self._timestamps.popleft()
+                now = monotonic()
+            self._timestamps.append(now)
+
+
+class ThrottledWFPAPI(WFPAPI):
+    """WFPAPI whose network calls share a single rate limit so that it can be
+    used from several threads at once. Paged endpoints read the total number of
+    items from the first page and fetch the remaining pages concurrently.
+
+    Args:
+        retriever: Retrieve object for interacting with WFP API
+        rate_limit: Rate limit in the form used by Download. Defaults to 1 call per 0.1 seconds.
+        page_workers: Number of pages to fetch concurrently. Defaults to 5.
+    """
+
+    def __init__(
+        self,
+        retriever: Retrieve,
+        rate_limit: dict = {"calls": 1, "period": 0.1},
+        page_workers: int = 5,
+    ):
+        super().__init__(retriever)
+        self._rate_limiter = RateLimiter(rate_limit["calls"], rate_limit["period"])
+        self._page_workers = page_workers
+
+    def _with_retry(self, api_method: Callable, **kwargs: Any) -> Any:
+        self._rate_limiter.wait()
+        return super()._with_retry(api_method, **kwargs)
+
+    def _get_all_pages(
+        self,
+        api_method: Callable,
+        model_cls: type,
+        base_filename: str,
+        countryiso3: str | None,
+        country_param: str,
+        extra_params: dict,
+    ) -> list:
+        all_items = []
+        for country in self._countryiso3s(countryiso3):
+
+            def get_page_items(page: int) -> tuple[list | None, int | None]:
+                kwargs = dict(extra_params)
+                kwargs["page"] = page
+                if country is not None:
+                    kwargs[country_param] = country
+                filename, log = self._filename_and_log(base_filename, country, page)
+                result = self._call(api_method, model_cls, filename, log, **kwargs)
+                if not result:
+                    return None, None
+                return result.items, getattr(result, "total_items", None)
+
+            items, total_items = get_page_items(1)
+            if not items:
+                continue
+            all_items.extend(items)
+            page = 2
+            if total_items and self._page_workers > 1:
+                no_pages = ceil(total_items / len(items))
+                if no_pages > 1:
+                    logger.info(
+                        f"Fetching {no_pages} pages of {base_filename} for {country}"
+                    )
+                    with ThreadPoolExecutor(max_workers=self._page_workers) as executor:
+                        for items, _ in executor.map(
+                            get_page_items, range(2, no_pages + 1)
+                        ):
+                            if not items:
+                                break
+                            all_items.extend(items)
+                            page += 1
+                    if page <= no_pages:
+                        continue
+            # Pick up any items added since the total was read. This also makes
+            # the call for the empty page that ends a sequential listing.
+            while True:
+                items, _ = get_page_items(page)
+                if not items:
+                    break
+                all_items.extend(items)
+                page += 1
+        return all_items
+
+    def get_currency_usd_indirect_quotations_since(
+        self, currency: str, since: datetime, countryiso3: str | None = None
+    ) -> list[UsdIndirectQuotation]:
+        """Get USD indirect quotations for a currency dated on or after a date
+        from the WFP API. The WFP API returns quotations newest first, so pages
+        are read one at a time only until a page reaches quotations from before
+        the date. Dates without a timezone are taken to be UTC.
+
+        Args:
+            currency: Currency 3-letter code
+            since: Date from which to get quotations
+            countryiso3: Country for which to obtain data. Defaults to all countries.
+
+        Returns:
+            List of USD indirect quotations from the WFP API
+        """
+        if since.tzinfo is None:
+            since = since.replace(tzinfo=UTC)
+        quotes = []
+        for country in self._countryiso3s(countryiso3):
+            page = 1
+            while True:
+                kwargs = {"page": page, "currency_name": currency}
+                if country is not None:
+                    # this endpoint uses country_iso3 rather than country_code
+                    kwargs["country_iso3"] = country
+                filename, log = self._filename_and_log(
+                    "Currency_UsdIndirectQuotation", country, page
+                )
+                result = self._call(
+                    self.currency_api.currency_usd_indirect_quotation_get,
+                    UsdIndirectQuotationPagedResult,
+                    filename,
+                    log,
+                    **kwargs,
+                )
+                items = result.items if result else None
+                if not items:
+                    break
+                reached_since = False
+                for quote in items:
+                    date = quote.var_date
+                    if date.tzinfo is None:
+                        date = date.replace(tzinfo=UTC)
+                    if date < since:
+                        reached_since = True
+                        continue
+                    quotes.append(quote)
+                if reached_since:
+                    break
+                page += 1
+        return quotes
@@ -24,8 +24,10 @@ from hdx.utilities.path import (
 from hdx.utilities.retriever import Retrieve
 
 from hdx.scraper.wfp.foodprices._version import __version__
+from hdx.scraper.wfp.foodprices.upload_manifest import UploadManifest
 from hdx.scraper.wfp.foodprices.utilities import get_currencies, get_now
 from hdx.scraper.wfp.foodprices.wfp_mappings import WFPMappings
+from hdx.scraper.wfp.foodprices.world.columnar_writer import columnar_suffix
 from hdx.scraper.wfp.foodprices.world.dataset_generator import DatasetGenerator
 from hdx.scraper.wfp.foodprices.world.global_markets import get_markets
 from hdx.scraper.wfp.foodprices.world.global_prices_generator import (
@@ -46,6 +48,13 @@ def main(
     use_saved: bool = False,
     countryiso3s: str = "",
     err_to_hdx: bool = False,
+    workers: int = 1,
+    pcode_cache: str = "",
+    admin_snapshot: str = "",
+    compress: bool = False,
+    columnar: bool = False,
+    manifest: str = "",
+    parquet_buffer: int = 0,
 ) -> None:
     """Generate datasets and create them in HDX
 
@@ -54,6 +63,13 @@ def main(
         use_saved (bool): Use saved data. Defaults to False.
         countryiso3s (str): Whether to limit to specific countries. Defaults to not limiting ("").
         err_to_hdx (bool): Whether to write any errors to HDX metadata. Defaults to False.
+        workers (int): Number of processes to use for HAPI prices files. Defaults to 1.
+        pcode_cache (str): Path of file in which to persist market p-codes. Defaults to not persisting ("").
+        admin_snapshot (str): Path of file in which to snapshot admin levels. Defaults to not snapshotting ("").
+        compress (bool): Whether to gzip compress global and HAPI prices files. Defaults to False.
+        columnar (bool): Whether to also upload Parquet files of global and HAPI prices. Defaults to False.
+        manifest (str): Path of manifest used to skip unchanged datasets. Defaults to "" (always update).
+        parquet_buffer (int): Size in MB of rows buffered for Parquet prices files. Defaults to 0 (65536 rows per file).
 
     Returns:
         None
@@ -91,7 +107,7 @@ def main(
                 wfp_api.update_retry_params(attempts=5, wait=3600)
                 wfp_mapping = WFPMappings(configuration, wfp_api, retriever)
                 _, commodities = wfp_mapping.build_commodity_category_mapping()
-                currencies = get_currencies(wfp_api)
+                currencies = get_currencies(wfp_api, folder)
                 markets = get_markets(downloader, folder)
                 if not markets:
                     logger.error("No markets data found!")
@@ -99,8 +115,13 @@ def main(
                 prices_generator = GlobalPricesGenerator(
                     configuration, downloader, folder
                 )
-                start_date, end_date = prices_generator.get_years_per_country()
-                year_to_pricespath = prices_generator.create_prices_files()
+                start_date, end_date, year_to_pricespath = (
+                    prices_generator.get_years_and_create_prices_files(
+                        compress=compress,
+                        columnar=columnar,
+                        parquet_buffer=parquet_buffer,
+                    )
+                )
                 if not year_to_pricespath:
                     logger.error("No prices data found!")
                     sys.exit(1)
@@ -109,7 +130,11 @@ def main(
                 )
                 dataset, showcase = (
                     dataset_generator.generate_global_dataset_and_showcase(
-                        year_to_pricespath, markets, commodities, currencies
+                        year_to_pricespath,
+                        markets,
+                        commodities,
+                        currencies,
+                        columnar=columnar,
                     )
                 )
                 snippet = "Countries, Commodities and Markets data"
@@ -119,19 +144,22 @@ def main(
                     )
                 )
                 dataset["notes"] = dataset["notes"] % snippet
-                dataset.create_in_hdx(
+                upload_manifest = UploadManifest(manifest)
+                upload_manifest.create_in_hdx(
+                    dataset,
+                    showcase,
                     remove_additional_resources=True,
                     match_resource_order=True,
                     updated_by_script=updated_by_script,
                     batch=batch,
                 )
-                showcase.create_in_hdx()
-                showcase.add_dataset(dataset)
 
                 year_to_prices_resource_id = {}
                 markets_resource_id = None
                 for resource in dataset.get_resources():
                     resource_name = resource["name"]
+                    if resource_name.endswith(columnar_suffix):
+                        continue
                     if dataset_generator.global_prices_name in resource_name:
                         year = int(resource_name[-4:])
                         year_to_prices_resource_id[year] = resource["id"]
@@ -144,6 +172,8 @@ def main(
                         downloader,
                         folder,
                         error_handler,
+                        pcode_cache,
+                        admin_snapshot,
                     )
                     hapi_output.setup_admins(retriever, countryiso3s)
                     hapi_commodities = hapi_output.process_commodities(
@@ -153,7 +183,13 @@ def main(
                         markets, dataset_id, markets_resource_id
                     )
                     hapi_year_to_pricespath = hapi_output.create_prices_files(
-                        year_to_pricespath, dataset_id, year_to_prices_resource_id
+                        year_to_pricespath,
+                        dataset_id,
+                        year_to_prices_resource_id,
+                        workers=workers,
+                        compress=compress,
+                        columnar=columnar,
+                        parquet_buffer=parquet_buffer,
                     )
                     hapi_dataset_generator = HAPIDatasetGenerator(
                         configuration,
@@ -166,6 +202,7 @@ def main(
                         hapi_markets,
                         hapi_commodities,
                         currencies,
+                        columnar=columnar,
                     )
                     if dataset:
                         dataset.update_from_yaml(
@@ -178,13 +215,14 @@ def main(
                             )
                         )
                         gc.collect()
-                        dataset.create_in_hdx(
+                        if upload_manifest.create_in_hdx(
+                            dataset,
                             remove_additional_resources=True,
                             match_resource_order=True,
                             updated_by_script=updated_by_script,
                             batch=batch,
-                        )
-                        logger.info("WFP global HAPI dataset created")
+                        ):
+                            logger.info("WFP global HAPI dataset created")
 
 
 if __name__ == "__main__":
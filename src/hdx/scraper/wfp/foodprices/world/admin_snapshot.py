@@ -0,0 +1,114 @@
+import logging
+import pickle
+from hashlib import sha256
+from importlib.metadata import version as get_version
+from os.path import exists
+from pathlib import Path
+
+from hdx.location.adminlevel import AdminLevel
+from hdx.utilities.retriever import Retrieve
+
+logger = logging.getLogger(__name__)
+
+
+class AdminSnapshot:
+    """Snapshot of the per-country p-code, name and parent maps of the admin
+    levels built from the global p-code tables. It is stored in binary form
+    and keyed by a hash of the contents of the downloaded tables, the countries
+    read and the version of the library building the admin levels so that a
+    stale snapshot is never used.
+
+    Args:
+        path: Path of snapshot file
+        files_hash: Hash of p-code table files and countries
+    """
+
+    version = 1
+    state_fields = (
+        "pcodes",
+        "pcode_lengths",
+        "name_to_pcode",
+        "name_parent_to_pcode",
+        "pcode_to_name",
+        "pcode_to_iso3",
+        "pcode_to_parent",
+        "parent_pcode_to_name",
+        "pcode_formats",
+        "_zeroes",
+        "_use_parent",
+    )
+
+    def __init__(self, path: str, files_hash: str):
+        self._path = path
+        self._key = (self.version, get_version("hdx-python-country"), files_hash)
+
+    @staticmethod
+    def get_files_hash(paths: list[Path | str], countryiso3s: list[str] | None) -> str:
+        """Get a hash of the contents of the given files and the countries.
+
+        Args:
+            paths: Paths of files
+            countryiso3s: Countries read from files
+
+        Returns:
+            Hash as hex string
+        """
+        digest = sha256()
+        for path in paths:
+            with open(path, "rb") as f:
+                while chunk := f.read(1048576):
+                    digest.update(chunk)
+            digest.update(b"\n")
+        if countryiso3s:
+            digest.update(",".join(countryiso3s).encode("utf-8"))
+        return digest.hexdigest()
+
+    def load(self, retriever: Retrieve) -> tuple[list[AdminLevel], str] | None:
+        """Load the admin levels from the snapshot if it exists and is not
+        stale.
+
+        Args:
+            retriever: Retrieve object to give to admin levels
+
+        Returns:
+            Tuple of admin levels and hash of p-code tables or None
+        """
+        if not exists(self._path):
+            return None
+        with open(self._path, "rb") as f:
+            try:
+                key = pickle.load(f)
+                if key != self._key:
+                    logger.info(f"Ignoring stale admin snapshot {self._path}")
+                    return None
+                tables_hash, states = pickle.load(f)
+            except (EOFError, pickle.UnpicklingError):
+                logger.warning(f"Ignoring unreadable admin snapshot {self._path}")
+                return None
+        admins = []
+        for i, state in enumerate(states):
+            admin = AdminLevel(admin_level=i + 1, retriever=retriever)
+            for field, value in zip(self.state_fields, state):
+                setattr(admin, field, value)
+            admins.append(admin)
+        logger.info(f"Loaded admin levels from snapshot {self._path}")
+        return admins, tables_hash
+
+    def save(self, admins: list[AdminLevel], tables_hash: str) -> None:
+        """Save the state of the admin levels to the snapshot.
+
+        Args:
+            admins: Admin levels
+            tables_hash: Hash of p-code tables
+
+        Returns:
+            None
+        """
+        states = [
+            tuple(getattr(admin, field) for field in self.state_fields)
+            for admin in admins
+        ]
+        with open(self._path, "wb") as f:
+            pickle.dump(self._key, f, pickle.HIGHEST_PROTOCOL)
+            pickle.dump((tables_hash, states), f, pickle.HIGHEST_PROTOCOL)
+        logger.info(f"Saved admin levels to snapshot {self._path}")
@@ -0,0 +1,215 @@
+import logging
+import re
+from collections.abc import Iterable, Iterator, Mapping, Sequence
+from typing import Any
+
+from hdx.data.resource import Resource
+
+logger = logging.getLogger(__name__)
+
+columnar_suffix = " (Parquet)"
+
+# Estimate of the memory used by a buffered row including its conversion to
+# columns when a batch is flushed
+ROW_BYTES = 2048
+
+
+def get_columnar_path(filepath: str) -> str:
+    """Get the path of the columnar file written next to a csv file.
+
+    Args:
+        filepath: Path of csv file which may be gzip compressed
+
+    Returns:
+        Path of Parquet file
+    """
+    return re.sub(r"\.csv(\.gz)?$", ".parquet", filepath)
+
+
+def get_columnar_resource(resourcedata: dict, filepath: str) -> Resource:
+    """Get a resource for the columnar file written next to a csv file. The
+    name of the resource is that of the csv resource with a Parquet suffix.
+
+    Args:
+        resourcedata: Resource metadata of csv file
+        filepath: Path of csv file which may be gzip compressed
+
+    Returns:
+        Parquet resource
+    """
+    resourcedata = dict(resourcedata)
+    resourcedata["name"] = f"{resourcedata['name']}{columnar_suffix}"
+    resourcedata["format"] = "parquet"
+    resource = Resource(resourcedata)
+    resource.set_format("parquet")
+    resource.set_file_to_upload(get_columnar_path(filepath))
+    return resource
+
+
+class RowBudget:
+    """Limit on the total number of rows buffered by a group of columnar
+    writers. When the limit is reached, the writer with the most buffered rows
+    is flushed.
+
+    Args:
+        buffer_size: Estimated size in bytes of the buffered rows
+    """
+
+    def __init__(self, buffer_size: int):
+        self.max_rows = max(buffer_size // ROW_BYTES, 1)
+        self._writers = []
+        self._rows = 0
+
+    def add_writer(self, writer: "ColumnarWriter") -> None:
+        self._writers.append(writer)
+
+    def remove_writer(self, writer: "ColumnarWriter") -> None:
+        self._writers.remove(writer)
+
+    def add_row(self) -> None:
+        self._rows += 1
+        if self._rows >= self.max_rows:
+            max(self._writers, key=len).flush()
+
+    def release_rows(self, no_rows: int) -> None:
+        self._rows -= no_rows
+
+
+class ColumnarWriter:
+    """Writer of rows to a Parquet file that can be used alongside a csv
+    writer in the same pass over the data. Rows are buffered into batches
+    which are converted column by column. Columns given a type of date, int or
+    float are typed with empty values becoming nulls. Other columns are
+    dictionary encoded strings. If no rows are written, no file is created.
+    Writers can share a row budget which bounds the rows buffered by all of
+    them. Requires pyarrow.
+
+    Args:
+        filepath: Path of Parquet file
+        headers: Headers of columns in order
+        column_types: Dictionary of header to date, int or float
+        batch_size: Number of rows per batch. Defaults to 65536.
+        budget: Row budget shared with other writers. Defaults to None.
+    """
+
+    def __init__(
+        self,
+        filepath: str,
+        headers: Sequence[str],
+        column_types: dict[str, str],
+        batch_size: int = 65536,
+        budget: RowBudget | None = None,
+    ):
+        try:
+            import pyarrow
+            import pyarrow.parquet
+        except ImportError as e:
+            raise ImportError(
+                "pyarrow is needed for columnar output. Install the parquet extra."
+            ) from e
+        self._pa = pyarrow
+        self._pq = pyarrow.parquet
+        self._filepath = filepath
+        self._headers = headers
+        self._batch_size = batch_size
+        types = {
+            "date": pyarrow.date32(),
+            "int": pyarrow.int64(),
+            "float": pyarrow.float64(),
+        }
+        dictionary_type = pyarrow.dictionary(pyarrow.int32(), pyarrow.string())
+        self._types = [types.get(column_types.get(header)) for header in headers]
+        self._schema = pyarrow.schema(
+            [
+                (header, dictionary_type if column_type is None else column_type)
+                for header, column_type in zip(headers, self._types)
+            ]
+        )
+        self._rows = []
+        self._writer = None
+        self.no_rows = 0
+        self._budget = budget
+        if budget:
+            budget.add_writer(self)
+
+    def __len__(self) -> int:
+        return len(self._rows)
+
+    def __enter__(self) -> "ColumnarWriter":
+        return self
+
+    def __exit__(self, *args: Any) -> None:
+        self.close()
+
+    def writerow(self, row: Mapping | Sequence) -> None:
+        """Write a row in dict form, in which case keys not in headers are
+        dropped, or in list form, in which case values must be in the order of
+        headers.
+
+        Args:
+            row: Row in dict or list form
+
+        Returns:
+            None
+        """
+        if isinstance(row, Mapping):
+            row = [row.get(header, "") for header in self._headers]
+        self._rows.append(row)
+        if self._budget:
+            self._budget.add_row()
+        if len(self._rows) >= self._batch_size:
+            self.flush()
+
+    def write_through(self, rows: Iterable[Mapping | Sequence]) -> Iterator:
+        """Write each row as it passes through so that the rows can be
+        consumed by another writer.
+
+        Args:
+            rows: Iterable of rows in dict or list form
+
+        Returns:
+            Iterator of the same rows
+        """
+        for row in rows:
+            self.writerow(row)
+            yield row
+
+    def flush(self) -> None:
+        """Write the buffered rows as a batch.
+
+        Returns:
+            None
+        """
+        if not self._rows:
+            return
+        pa = self._pa
+        arrays = []
+        for column_type, column in zip(self._types, zip(*self._rows)):
+            if column_type is None:
+                values = ["" if value is None else str(value) for value in column]
+                arrays.append(pa.array(values, pa.string()).dictionary_encode())
+            else:
+                values = [
+                    None if value is None or value == "" else str(value)
+                    for value in column
+                ]
+                arrays.append(pa.array(values, pa.string()).cast(column_type))
+        if self._writer is None:
+            self._writer = self._pq.ParquetWriter(self._filepath, self._schema)
+        self._writer.write_batch(
+            pa.record_batch(arrays, schema=self._schema),
+        )
+        self.no_rows += len(self._rows)
+        if self._budget:
+            self._budget.release_rows(len(self._rows))
+        self._rows = []
+
+    def close(self) -> None:
+        self.flush()
+        if self._budget:
+            self._budget.remove_writer(self)
+            self._budget = None
+        if self._writer is not None:
+            self._writer.close()
+            self._writer = None
+            logger.info(f"Wrote {self.no_rows} rows to {self._filepath}")
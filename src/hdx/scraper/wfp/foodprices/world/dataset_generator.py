@@ -8,6 +8,10 @@ from hdx.data.resource import Resource
 from hdx.data.showcase import Showcase
 from slugify import slugify
 
+from hdx.scraper.wfp.foodprices.utilities import get_csv_format
+from hdx.scraper.wfp.foodprices.world.columnar_writer import get_columnar_resource
+from hdx.scraper.wfp.foodprices.world.global_markets import GlobalMarkets
+
 logger = logging.getLogger(__name__)
 
 
@@ -71,9 +75,10 @@ class DatasetGenerator:
     def generate_global_dataset_and_showcase(
         self,
         year_to_pricespath: dict,
-        markets: list[dict],
+        markets: GlobalMarkets,
         commodities: list[dict],
         currencies: list[dict],
+        columnar: bool = False,
     ) -> tuple[Dataset | None, Showcase | None]:
         dataset, showcase = self.get_dataset_and_showcase()
         dataset.set_time_period(self._start_date, self._end_date)
@@ -81,15 +86,19 @@ class DatasetGenerator:
 
         for year in sorted(year_to_pricespath, reverse=True):
             filepath = year_to_pricespath[year]
+            file_format = get_csv_format(filepath)
             resourcedata = {
                 "name": f"{self.global_prices_name} {year}",
                 "description": f"Prices data for {year}",
-                "format": "csv",
+                "format": file_format,
             }
             resource = Resource(resourcedata)
-            resource.set_format("csv")
+            resource.set_format(file_format)
             resource.set_file_to_upload(filepath)
             dataset.add_update_resource(resource)
+            if columnar:
+                resource = get_columnar_resource(resourcedata, filepath)
+                dataset.add_update_resource(resource)
 
         filename = "wfp_commodities_global.csv"
         resourcedata = {
@@ -116,7 +125,7 @@ class DatasetGenerator:
         dataset.generate_resource(
             self._folder,
             filename,
-            sorted(markets, key=lambda x: int(x["market_id"])),
+            markets.iterate_sorted(),
             resourcedata,
             markets_headers,
         )
@@ -1,28 +1,101 @@
 import logging
+from collections.abc import Iterator
 from glob import iglob
+from heapq import merge
+from itertools import chain
 
 from hdx.utilities.downloader import Download
 
 logger = logging.getLogger(__name__)
 
 
-def get_markets(downloader: Download, folder: str) -> list | None:
-    filepaths = []
-    for filepath in iglob(f"{folder}/wfp_markets*.csv", recursive=False):
-        if any(x in filepath for x in ("_global",)):
-            continue
-        filepaths.append(filepath)
-
-    rows = []
-    for filepath in sorted(filepaths):
-        countryiso3 = filepath[-7:-4].upper()
-        _, iterator = downloader.get_tabular_rows(
-            filepath, dict_form=True, encoding="utf-8"
-        )
-        logger.info(f"Reading markets from {countryiso3}: {filepath}")
-
-        for row in iterator:
-            rows.append(row)
-    if len(rows) == 0:
+def _market_id_key(row: dict) -> int:
+    return int(row["market_id"])
+
+
+class GlobalMarkets:
+    """Markets of all countries read from the country markets files. Rows with
+    a market id that has already been read are reported but all rows are kept.
+    Iterating gives the rows in the order of the files. The rows of each
+    country file also form a run sorted by market id, sorting a copy where the
+    file is not in market id order, so that all rows can be iterated in market
+    id order by a k-way merge of the runs.
+
+    Args:
+        downloader: Download object
+        folder: Folder containing country markets files
+    """
+
+    def __init__(self, downloader: Download, folder: str):
+        self._downloader = downloader
+        self._folder = folder
+        self._countries = {}
+        self._runs = []
+        self._sorted_runs = []
+        self._no_rows = 0
+        self.duplicates = 0
+
+    def __len__(self) -> int:
+        return self._no_rows
+
+    def __iter__(self) -> Iterator[dict]:
+        return chain.from_iterable(self._runs)
+
+    def read(self) -> None:
+        """Read the country markets files in country order.
+
+        Returns:
+            None
+        """
+        filepaths = []
+        for filepath in iglob(f"{self._folder}/wfp_markets*.csv", recursive=False):
+            if any(x in filepath for x in ("_global",)):
+                continue
+            filepaths.append(filepath)
+
+        for filepath in sorted(filepaths):
+            countryiso3 = filepath[-7:-4].upper()
+            _, iterator = self._downloader.get_tabular_rows(
+                filepath, dict_form=True, encoding="utf-8"
+            )
+            logger.info(f"Reading markets from {countryiso3}: {filepath}")
+            run = []
+            is_sorted = True
+            previous_id = None
+            for row in iterator:
+                market_id = row["market_id"]
+                existing_countryiso3 = self._countries.get(market_id)
+                if existing_countryiso3 is not None:
+                    logger.error(
+                        f"Market {market_id} from {countryiso3} duplicates market from {existing_countryiso3}!"
+                    )
+                    self.duplicates += 1
+                self._countries[market_id] = row["countryiso3"]
+                market_id = int(market_id)
+                if previous_id is not None and market_id < previous_id:
+                    is_sorted = False
+                previous_id = market_id
+                run.append(row)
+            if run:
+                self._runs.append(run)
+                if is_sorted:
+                    self._sorted_runs.append(run)
+                else:
+                    self._sorted_runs.append(sorted(run, key=_market_id_key))
+                self._no_rows += len(run)
+
+    def iterate_sorted(self) -> Iterator[dict]:
+        """Iterate over the markets in market id order.
+
+        Returns:
+            Iterator of market rows
+        """
+        return merge(*self._sorted_runs, key=_market_id_key)
+
+
+def get_markets(downloader: Download, folder: str) -> GlobalMarkets | None:
+    markets = GlobalMarkets(downloader, folder)
+    markets.read()
+    if len(markets) == 0:
         return None
-    return rows
+    return markets
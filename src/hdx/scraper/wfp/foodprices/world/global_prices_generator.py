@@ -1,13 +1,21 @@
 import logging
-from datetime import UTC, datetime
+from contextlib import ExitStack
+from csv import DictWriter
+from datetime import datetime
 from glob import iglob
 from os.path import join
 
 from hdx.api.configuration import Configuration
-from hdx.utilities.dateparse import default_date, default_enddate, parse_date
+from hdx.utilities.dateparse import default_date, default_enddate
 from hdx.utilities.dictandlist import dict_of_sets_add
 from hdx.utilities.downloader import Download
-from hdx.utilities.saver import save_iterable
+
+from hdx.scraper.wfp.foodprices.utilities import open_csv, parse_iso_date
+from hdx.scraper.wfp.foodprices.world.columnar_writer import (
+    ColumnarWriter,
+    RowBudget,
+    get_columnar_path,
+)
 
 logger = logging.getLogger(__name__)
 
@@ -23,61 +31,156 @@ class GlobalPricesGenerator:
         self._years = None
         self._year_to_countries = {}
 
-    def get_years_per_country(self) -> tuple[datetime, datetime]:
-        for filepath in sorted(
-            iglob(f"{self._folder}/wfp_food_prices*.csv", recursive=False)
-        ):
-            if "_global" in filepath:
-                continue
-            countryiso3 = filepath[-7:-4].upper()
-            self._prices_paths[countryiso3] = filepath
+    def _get_prices_paths(self) -> dict[str, str]:
+        if not self._prices_paths:
+            for filepath in sorted(
+                iglob(f"{self._folder}/wfp_food_prices*.csv", recursive=False)
+            ):
+                if "_global" in filepath:
+                    continue
+                countryiso3 = filepath[-7:-4].upper()
+                self._prices_paths[countryiso3] = filepath
+        return self._prices_paths
+
+    def _scan_prices(
+        self,
+        find_years: bool,
+        output_dir: str | None,
+        compress: bool = False,
+        columnar: bool = False,
+        parquet_buffer: int = 0,
+    ) -> tuple[datetime, datetime, dict]:
+        """Read each country prices file once, optionally finding the date
+        range and years with data and optionally routing rows to a global
+        prices file for their year. A columnar file can be written next to
+        each global prices file in the same pass. Rows go straight to the file
+        for their year in country order rather than being collected. A Parquet
+        buffer size bounds the rows buffered for columnar files across all
+        years.
+
+        Args:
+            find_years: Whether to find date range and years per country
+            output_dir: Folder in which to create files or None to not create them
+            compress: Whether to gzip compress files. Defaults to False.
+            columnar: Whether to also create Parquet files. Defaults to False.
+            parquet_buffer: Size in MB of rows buffered for Parquet files. Defaults to 0 (65536 rows per file).
+
+        Returns:
+            Earliest date, latest date and dictionary of year to file path
+        """
+        prices_paths = self._get_prices_paths()
+        if output_dir is not None:
+            prices_headers = ["countryiso3"] + self._configuration["prices_headers"]
+            if not output_dir:
+                output_dir = self._folder
+            filename = self.filename
+            if compress:
+                filename = f"{filename}.gz"
+            column_types = self._configuration["prices_column_types"]
+            if parquet_buffer:
+                budget = RowBudget(parquet_buffer * 1048576)
+            else:
+                budget = None
         earliest_date = default_enddate
         latest_date = default_date
         years = set()
-        for countryiso3, filepath in self._prices_paths.items():
-            _, iterator = self._downloader.get_tabular_rows(
-                filepath, dict_form=True, encoding="utf-8"
-            )
-            logger.info(f"Reading year info from {countryiso3}: {filepath}")
-            for row in iterator:
-                date = parse_date(row["date"])
-                if date < earliest_date:
-                    earliest_date = date
-                if date > latest_date:
-                    latest_date = date
-                years.add(date.year)
-                dict_of_sets_add(self._year_to_countries, date.year, countryiso3)
-        self._years = sorted(years, reverse=True)
-        return earliest_date, latest_date
-
-    def create_prices_files(self, output_dir: str = "") -> dict:
         year_to_path = {}
-
-        prices_headers = self._configuration["prices_headers"]
-        prices_headers.insert(0, "countryiso3")
-
-        for year in self._years:
-            logger.info(f"Processing {year} prices")
-            startdate = datetime(year, 1, 1, tzinfo=UTC)
-            enddate = datetime(year, 12, 31, 23, 59, 59, tzinfo=UTC)
-            rows = []
-            for countryiso3 in sorted(self._year_to_countries[year]):
-                filepath = self._prices_paths[countryiso3]
+        with ExitStack() as stack:
+            year_to_writers = {}
+            for countryiso3 in sorted(prices_paths):
+                filepath = prices_paths[countryiso3]
                 _, iterator = self._downloader.get_tabular_rows(
                     filepath, dict_form=True, encoding="utf-8"
                 )
+                logger.info(f"Processing {countryiso3} prices: {filepath}")
+                country_years = set()
                 for row in iterator:
-                    date = parse_date(row["date"])
-                    if date < startdate or date > enddate:
+                    date = parse_iso_date(row["date"])
+                    year = date.year
+                    if find_years:
+                        if date < earliest_date:
+                            earliest_date = date
+                        if date > latest_date:
+                            latest_date = date
+                        country_years.add(year)
+                    if output_dir is None:
                         continue
+                    writers = year_to_writers.get(year)
+                    if writers is None:
+                        year_filepath = join(output_dir, filename.format(year))
+                        file = stack.enter_context(open_csv(year_filepath, "w"))
+                        writer = DictWriter(file, prices_headers, extrasaction="ignore")
+                        writer.writeheader()
+                        writers = [writer]
+                        if columnar:
+                            writer = ColumnarWriter(
+                                get_columnar_path(year_filepath),
+                                prices_headers,
+                                column_types,
+                                budget=budget,
+                            )
+                            writers.append(stack.enter_context(writer))
+                        year_to_writers[year] = writers
+                        year_to_path[year] = year_filepath
                     row["countryiso3"] = countryiso3
-                    rows.append(row)
-            if len(rows) == 0:
-                continue
-            if not output_dir:
-                output_dir = self._folder
-            filename = self.filename.format(year)
-            filepath = join(output_dir, filename)
-            save_iterable(filepath, rows, headers=prices_headers)
-            year_to_path[year] = filepath
+                    for writer in writers:
+                        writer.writerow(row)
+                for year in country_years:
+                    dict_of_sets_add(self._year_to_countries, year, countryiso3)
+                years.update(country_years)
+        if find_years:
+            self._years = sorted(years, reverse=True)
+        year_to_path = {
+            year: year_to_path[year] for year in sorted(year_to_path, reverse=True)
+        }
+        return earliest_date, latest_date, year_to_path
+
+    def get_years_per_country(self) -> tuple[datetime, datetime]:
+        earliest_date, latest_date, _ = self._scan_prices(True, None)
+        return earliest_date, latest_date
+
+    def create_prices_files(
+        self,
+        output_dir: str = "",
+        compress: bool = False,
+        columnar: bool = False,
+        parquet_buffer: int = 0,
+    ) -> dict:
+        """Create a global prices file per year. Each country prices file is
+        read once and its rows are routed to the file for their year.
+
+        Args:
+            output_dir: Folder in which to create files. Defaults to "" (folder).
+            compress: Whether to gzip compress files. Defaults to False.
+            columnar: Whether to also create Parquet files. Defaults to False.
+            parquet_buffer: Size in MB of rows buffered for Parquet files. Defaults to 0 (65536 rows per file).
+
+        Returns:
+            Dictionary of year to file path
+        """
+        _, _, year_to_path = self._scan_prices(
+            False, output_dir, compress, columnar, parquet_buffer
+        )
         return year_to_path
+
+    def get_years_and_create_prices_files(
+        self,
+        output_dir: str = "",
+        compress: bool = False,
+        columnar: bool = False,
+        parquet_buffer: int = 0,
+    ) -> tuple[datetime, datetime, dict]:
+        """Find the date range and years per country and create a global
+        prices file per year in a single read of each country prices file. This
+        is equivalent to calling get_years_per_country then create_prices_files.
+
+        Args:
+            output_dir: Folder in which to create files. Defaults to "" (folder).
+            compress: Whether to gzip compress files. Defaults to False.
+            columnar: Whether to also create Parquet files. Defaults to False.
+            parquet_buffer: Size in MB of rows buffered for Parquet files. Defaults to 0 (65536 rows per file).
+
+        Returns:
+            Earliest date, latest date and dictionary of year to file path
+        """
+        return self._scan_prices(True, output_dir, compress, columnar, parquet_buffer)
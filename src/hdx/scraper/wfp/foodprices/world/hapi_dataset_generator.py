@@ -5,6 +5,9 @@ from hdx.api.configuration import Configuration
 from hdx.data.dataset import Dataset
 from hdx.data.resource import Resource
 
+from hdx.scraper.wfp.foodprices.utilities import get_csv_format
+from hdx.scraper.wfp.foodprices.world.columnar_writer import get_columnar_resource
+
 logger = getLogger(__name__)
 
 
@@ -48,6 +51,7 @@ class HAPIDatasetGenerator:
         hapi_markets: list[dict],
         hapi_commodities: list[dict],
         hapi_currencies: list[dict],
+        columnar: bool = False,
     ) -> Dataset | None:
         if not hapi_year_to_pricespath:
             logger.warning("Food prices has no data!")
@@ -68,9 +72,12 @@ class HAPIDatasetGenerator:
                 "p_coded": True,
             }
             resource = Resource(resourcedata)
-            resource.set_format("csv")
+            resource.set_format(get_csv_format(filepath))
             resource.set_file_to_upload(filepath)
             dataset.add_update_resource(resource)
+            if columnar:
+                resource = get_columnar_resource(resourcedata, filepath)
+                dataset.add_update_resource(resource)
 
         for i, rows in enumerate((hapi_markets, hapi_commodities, hapi_currencies)):
             resource_config = resources_config[i + 1]
@@ -1,5 +1,8 @@
 import logging
-from copy import deepcopy
+from concurrent.futures import ProcessPoolExecutor
+from contextlib import ExitStack
+from csv import DictReader
+from operator import itemgetter
 from os.path import join
 
 from dateutil.relativedelta import relativedelta
@@ -7,26 +10,73 @@ from hdx.api.configuration import Configuration
 from hdx.api.utilities.hdx_error_handler import HDXErrorHandler
 from hdx.location.adminlevel import AdminLevel
 from hdx.location.country import Country
-from hdx.utilities.dateparse import iso_string_from_datetime, parse_date
+from hdx.utilities.dateparse import iso_string_from_datetime
 from hdx.utilities.downloader import Download
 from hdx.utilities.retriever import Retrieve
-from hdx.utilities.saver import save_iterable
+
+from hdx.scraper.wfp.foodprices.utilities import (
+    open_csv,
+    parse_iso_date,
+    write_csv,
+)
+from hdx.scraper.wfp.foodprices.world.admin_snapshot import AdminSnapshot
+from hdx.scraper.wfp.foodprices.world.columnar_writer import (
+    ROW_BYTES,
+    ColumnarWriter,
+    get_columnar_path,
+)
+from hdx.scraper.wfp.foodprices.world.global_markets import GlobalMarkets
+from hdx.scraper.wfp.foodprices.world.pcode_cache import PCodeCache
 
 logger = logging.getLogger(__name__)
 
 
 class HAPIOutput:
+    admin_fields = (
+        "provider_admin1_name",
+        "provider_admin2_name",
+        "admin1_code",
+        "admin1_name",
+        "admin2_code",
+        "admin2_name",
+        "admin_level",
+    )
+    # Fields of a HAPI price row that come from the global price row and the
+    # prices resource in the order _write_prices_file gives them. The other
+    # fields come from the market base row.
+    price_fields = (
+        "commodity_category",
+        "commodity_name",
+        "commodity_code",
+        "unit",
+        "price_flag",
+        "price_type",
+        "currency_code",
+        "price",
+        "usd_price",
+        "reference_period_start",
+        "reference_period_end",
+        "dataset_hdx_id",
+        "resource_hdx_id",
+    )
+
     def __init__(
         self,
         configuration: Configuration,
         downloader: Download,
         folder: str,
         error_handler: HDXErrorHandler,
+        pcode_cache_path: str = "",
+        admin_snapshot_path: str = "",
     ) -> None:
         self._configuration = configuration
         self._downloader = downloader
         self._folder = folder
         self._error_handler = error_handler
+        self._pcode_cache_path = pcode_cache_path
+        self._pcode_cache = None
+        self._admin_snapshot_path = admin_snapshot_path
+        self._admin_warnings = None
         self._admins = []
         self._base_rows = {}
 
@@ -35,13 +85,29 @@ class HAPIOutput:
         retriever: Retrieve,
         countryiso3s: list[str] | None = None,
     ):
-        _, iterator = retriever.get_tabular_rows(AdminLevel.admin_url, dict_form=True)
+        admin_path = retriever.download_file(AdminLevel.admin_url)
+        formats_path = retriever.download_file(AdminLevel.formats_url)
+        snapshot = None
+        if self._admin_snapshot_path:
+            files_hash = AdminSnapshot.get_files_hash(
+                [admin_path, formats_path], countryiso3s
+            )
+            snapshot = AdminSnapshot(self._admin_snapshot_path, files_hash)
+            loaded = snapshot.load(retriever)
+            if loaded:
+                self._admins, tables_hash = loaded
+                self._admins[1].set_parent_admins_from_adminlevels([self._admins[0]])
+                self._setup_pcode_cache(tables_hash)
+                return
+        _, iterator = retriever.downloader.get_tabular_rows(admin_path, dict_form=True)
         pcode_rows = []
         for row in iterator:
             if countryiso3s and row["Location"] not in countryiso3s:
                 continue
             pcode_rows.append(row)
-        _, iterator = retriever.get_tabular_rows(AdminLevel.formats_url, dict_form=True)
+        _, iterator = retriever.downloader.get_tabular_rows(
+            formats_path, dict_form=True
+        )
         pcode_formats_rows = []
         for row in iterator:
             if countryiso3s and row["Location"] not in countryiso3s:
@@ -54,6 +120,26 @@ class HAPIOutput:
             admin.load_pcode_formats_from_iterable(pcode_formats_rows)
             self._admins.append(admin)
         self._admins[1].set_parent_admins_from_adminlevels([self._admins[0]])
+        if not snapshot and not self._pcode_cache_path:
+            return
+        tables_hash = PCodeCache.get_tables_hash(pcode_rows, pcode_formats_rows)
+        if snapshot:
+            snapshot.save(self._admins, tables_hash)
+        self._setup_pcode_cache(tables_hash)
+
+    def _setup_pcode_cache(self, tables_hash: str) -> None:
+        if self._pcode_cache_path:
+            self._pcode_cache = PCodeCache(self._pcode_cache_path, tables_hash)
+
+    def _add_admin_warning(
+        self, method: str, identifier: str, text: str, market_name: str
+    ) -> None:
+        getattr(self._error_handler, method)(
+            "WFPFoodPrice", identifier, text, market_name, message_type="warning"
+        )
+        # Messages are only recorded while resolving a p-code cache entry
+        if self._admin_warnings is not None:
+            self._admin_warnings.append((method, identifier, text))
 
     def complete_admin(self, row: dict, base_row: dict):
         market_name = row["market"]
@@ -77,12 +163,11 @@ class HAPIOutput:
                 base_row["admin_level"] = 1
             else:
                 base_row["admin_level"] = 0
-                self._error_handler.add_missing_value_message(
-                    "WFPFoodPrice",
+                self._add_admin_warning(
+                    "add_missing_value_message",
                     countryiso3,
                     "admin 1 name for market",
                     market_name,
-                    message_type="warning",
                 )
                 base_row["warning"].add("no adm1 name in prov2 name")
             return
@@ -104,12 +189,11 @@ class HAPIOutput:
                 base_row["admin_level"] = 2
             else:
                 base_row["admin_level"] = 0
-                self._error_handler.add_missing_value_message(
-                    "WFPFoodPrice",
+                self._add_admin_warning(
+                    "add_missing_value_message",
                     countryiso3,
                     "admin 2 name for market",
                     market_name,
-                    message_type="warning",
                 )
                 base_row["warning"].add("no adm2 name in prov1 name")
             return
@@ -123,12 +207,11 @@ class HAPIOutput:
         else:
             adm1_code = ""
             base_row["admin_level"] = 0
-            self._error_handler.add_missing_value_message(
-                "WFPFoodPrice",
+            self._add_admin_warning(
+                "add_missing_value_message",
                 countryiso3,
                 "admin 1 name for market",
                 market_name,
-                message_type="warning",
             )
             base_row["warning"].add("no adm1 name")
 
@@ -145,12 +228,11 @@ class HAPIOutput:
                 parent_code = self._admins[1].pcode_to_parent.get(adm2_code)
                 if adm1_code and adm1_code != parent_code:
                     message = f"PCode mismatch {adm1_code}->{parent_code} (parent)"
-                    self._error_handler.add_message(
-                        "WFPFoodPrice",
+                    self._add_admin_warning(
+                        "add_message",
                         f"{countryiso3}-{adm2_code}",
                         message,
                         market_name,
-                        message_type="warning",
                     )
                     base_row["warning"].add(message)
                     base_row["admin1_code"] = parent_code
@@ -164,15 +246,53 @@ class HAPIOutput:
             identifier = f"{countryiso3}-{provider_admin1_name}"
         else:
             identifier = countryiso3
-        self._error_handler.add_missing_value_message(
-            "WFPFoodPrice",
+        self._add_admin_warning(
+            "add_missing_value_message",
             identifier,
             "admin 2 name for market",
             market_name,
-            message_type="warning",
         )
         base_row["warning"].add("no adm2 name")
 
+    def complete_admin_from_cache(self, row: dict, base_row: dict):
+        """Complete the admin fields of the base row from the p-code cache,
+        resolving them with complete_admin and adding them to the cache if the
+        market's admin names have not been seen before.
+
+        Args:
+            row: Market row
+            base_row: HAPI base row to complete
+
+        Returns:
+            None
+        """
+        countryiso3 = row["countryiso3"]
+        rules = tuple(
+            countryiso3 in self._configuration[rule]
+            for rule in ("unused_adm1", "unused_adm2", "adm1_only")
+        )
+        key = PCodeCache.get_key(
+            countryiso3, row["admin1"] or "", row["admin2"] or "", rules
+        )
+        entry = self._pcode_cache.get(key)
+        if entry is None:
+            self._admin_warnings = []
+            self.complete_admin(row, base_row)
+            entry = {field: base_row[field] for field in self.admin_fields}
+            entry["warnings"] = sorted(base_row["warning"])
+            entry["messages"] = self._admin_warnings
+            self._admin_warnings = None
+            self._pcode_cache.set(key, entry)
+            return
+        for field in self.admin_fields:
+            base_row[field] = entry[field]
+        base_row["warning"].update(entry["warnings"])
+        market_name = row["market"]
+        for method, identifier, text in entry["messages"]:
+            getattr(self._error_handler, method)(
+                "WFPFoodPrice", identifier, text, market_name, message_type="warning"
+            )
+
     def complete_base_row(self, row: dict, base_row: dict):
         countryiso3 = row["countryiso3"]
         base_row["location_code"] = countryiso3
@@ -182,7 +302,10 @@ class HAPIOutput:
         base_row["in_gho"] = (
             "Y" if Country.get_gho_status_from_iso3(countryiso3) else "N"
         )
-        self.complete_admin(row, base_row)
+        if self._pcode_cache is None:
+            self.complete_admin(row, base_row)
+        else:
+            self.complete_admin_from_cache(row, base_row)
         base_row["market_name"] = row["market"]
         base_row["market_code"] = row["market_id"]
         base_row["lat"] = row["latitude"] or ""
@@ -212,23 +335,53 @@ class HAPIOutput:
         del hapi_row["error"]
         hapi_row["error"] = errors
 
+    @classmethod
+    def get_price_row_layout(
+        cls, headers: list[str]
+    ) -> tuple[list[str], tuple[int, ...]]:
+        """Get the market base row headers and, for each HAPI prices header,
+        the position of its value in a market base row followed by the price
+        fields.
+
+        Args:
+            headers: HAPI prices headers
+
+        Returns:
+            Market base row headers and position of each header's value
+        """
+        market_headers = [
+            header for header in headers if header not in cls.price_fields
+        ]
+        positions = tuple(
+            len(market_headers) + cls.price_fields.index(header)
+            if header in cls.price_fields
+            else market_headers.index(header)
+            for header in headers
+        )
+        return market_headers, positions
+
     def process_markets(
-        self, markets: list[dict], dataset_id: str, resource_id: str
+        self, markets: GlobalMarkets, dataset_id: str, resource_id: str
     ) -> list[dict]:
         logger.info("Processing HAPI markets output")
+        prices_headers = self._configuration["hapi_dataset"]["resources"][0]["headers"]
+        market_headers, _ = self.get_price_row_layout(prices_headers)
         hapi_rows = []
         for row in markets:
-            hapi_base_row = {
+            hapi_row = {
                 "warning": set(),
                 "error": set(),
             }
-            self.complete_base_row(row, hapi_base_row)
-            self._base_rows[hapi_base_row["market_code"]] = hapi_base_row
-            hapi_row = deepcopy(hapi_base_row)
+            self.complete_base_row(row, hapi_row)
             hapi_row["dataset_hdx_id"] = dataset_id
             hapi_row["resource_hdx_id"] = resource_id
             self.add_warnings_errors(hapi_row)
+            self._base_rows[hapi_row["market_code"]] = tuple(
+                hapi_row[header] for header in market_headers
+            )
             hapi_rows.append(hapi_row)
+        if self._pcode_cache is not None:
+            self._pcode_cache.save()
         hapi_rows = sorted(
             hapi_rows,
             key=lambda row: (
@@ -243,66 +396,185 @@ class HAPIOutput:
         )
         return hapi_rows
 
+    @staticmethod
+    def get_reference_period(date_str: str) -> tuple[str, str]:
+        """Get the start and end of the one month food price reference period
+        beginning on the given date.
+
+        Args:
+            date_str: Date in YYYY-MM-DD form
+
+        Returns:
+            Reference period start and end as ISO strings
+        """
+        reference_period_start = parse_iso_date(date_str)
+        reference_period_end = reference_period_start + relativedelta(
+            months=1,
+            days=-1,
+            hours=23,
+            minutes=59,
+            seconds=59,
+            microseconds=999999,
+        )
+        return (
+            iso_string_from_datetime(reference_period_start),
+            iso_string_from_datetime(reference_period_end),
+        )
+
     def create_prices_files(
         self,
         year_to_path: dict,
         dataset_id: str,
         year_to_prices_resource_id: dict,
         output_dir: str = "",
+        workers: int = 1,
+        compress: bool = False,
+        columnar: bool = False,
+        parquet_buffer: int = 0,
     ) -> dict:
+        """Create HAPI prices files for the latest ten years from the global
+        prices files. The files can be generated in parallel by a pool of
+        processes. The output is the same as generating them sequentially.
+
+        Args:
+            year_to_path: Dictionary of year to global prices file path
+            dataset_id: HAPI dataset id
+            year_to_prices_resource_id: Dictionary of year to HAPI resource id
+            output_dir: Folder in which to create files. Defaults to "" (folder).
+            workers: Number of processes to use. Defaults to 1 (no pool).
+            compress: Whether to gzip compress files. Defaults to False.
+            columnar: Whether to also create Parquet files. Defaults to False.
+            parquet_buffer: Size in MB of rows buffered for Parquet files shared by processes. Defaults to 0 (65536 rows per file).
+
+        Returns:
+            Dictionary of year to HAPI prices file path
+        """
         logger.info("Processing HAPI prices output")
         configuration = self._configuration["hapi_dataset"]["resources"][0]
         headers = configuration["headers"]
+        _, positions = self.get_price_row_layout(headers)
+        column_types = configuration["column_types"] if columnar else None
+        batch_size = 65536
+        if parquet_buffer:
+            rows = parquet_buffer * 1048576 // max(workers, 1) // ROW_BYTES
+            batch_size = max(rows, 1)
+        if not output_dir:
+            output_dir = self._folder
 
-        hapi_year_to_path = {}
+        tasks = {}
         years = sorted(year_to_path.keys(), reverse=True)
         for year in years[:10]:
-            filepath = year_to_path[year]
-            _, iterator = self._downloader.get_tabular_rows(
-                filepath, dict_form=True, encoding="utf-8"
+            filename = configuration["filename"].format(year)
+            if compress:
+                filename = f"{filename}.gz"
+            tasks[year] = (
+                year_to_path[year],
+                join(output_dir, filename),
+                headers,
+                positions,
+                dataset_id,
+                year_to_prices_resource_id[year],
+                column_types,
+                batch_size,
             )
-            logger.info(f"Reading global prices from {filepath}")
-
-            def get_rows():
-                for row in iterator:
-                    market_id = row["market_id"]
-                    hapi_row = deepcopy(self._base_rows[market_id])
-                    hapi_row["commodity_category"] = row["category"]
-                    hapi_row["commodity_name"] = row["commodity"]
-                    hapi_row["commodity_code"] = row["commodity_id"]
-                    hapi_row["unit"] = row["unit"]
-                    hapi_row["price_flag"] = row["priceflag"]
-                    hapi_row["price_type"] = row["pricetype"]
-                    hapi_row["currency_code"] = row["currency"]
-                    hapi_row["price"] = row["price"]
-                    hapi_row["usd_price"] = row["usdprice"]
-                    reference_period_start = parse_date(
-                        row["date"], date_format="%Y-%m-%d"
-                    )
-                    hapi_row["reference_period_start"] = iso_string_from_datetime(
-                        reference_period_start
-                    )
-                    reference_period_end = reference_period_start + relativedelta(
-                        months=1,
-                        days=-1,
-                        hours=23,
-                        minutes=59,
-                        seconds=59,
-                        microseconds=999999,
-                    )  # food price reference period is one month
-                    hapi_row["reference_period_end"] = iso_string_from_datetime(
-                        reference_period_end
-                    )
-                    hapi_row["dataset_hdx_id"] = dataset_id
-                    hapi_row["resource_hdx_id"] = year_to_prices_resource_id[year]
-                    self.add_warnings_errors(hapi_row)
-                    yield hapi_row
 
-            if not output_dir:
-                output_dir = self._folder
-            filename = configuration["filename"].format(year)
-            filepath = join(output_dir, filename)
-            save_iterable(filepath, get_rows(), headers)
-            hapi_year_to_path[year] = filepath
+        if workers > 1 and len(tasks) > 1:
+            with ProcessPoolExecutor(
+                max_workers=min(workers, len(tasks)),
+                initializer=_set_worker_base_rows,
+                initargs=(self._base_rows,),
+            ) as executor:
+                futures = {
+                    year: executor.submit(_write_prices_file_in_worker, *task)
+                    for year, task in tasks.items()
+                }
+                for future in futures.values():
+                    future.result()
+        else:
+            for task in tasks.values():
+                _write_prices_file(self._base_rows, *task)
+        return {year: task[1] for year, task in tasks.items()}
+
+
+# Market base rows of a pool worker. These are set once per worker by the pool
+# initializer so that they are not sent to the worker with every file.
+_worker_base_rows = {}
 
-        return hapi_year_to_path
+
+def _set_worker_base_rows(base_rows: dict) -> None:
+    global _worker_base_rows
+    _worker_base_rows = base_rows
+
+
+def _write_prices_file_in_worker(*args) -> int:
+    return _write_prices_file(_worker_base_rows, *args)
+
+
+def _write_prices_file(
+    base_rows: dict,
+    prices_path: str,
+    filepath: str,
+    headers: list[str],
+    positions: tuple[int, ...],
+    dataset_id: str,
+    resource_id: str,
+    column_types: dict | None = None,
+    batch_size: int = 65536,
+) -> int:
+    """Write a HAPI prices file from a global prices file, adding the market
+    fields from the base rows to each price row. If column types are given, a
+    columnar file is written next to it in the same pass.
+
+    Args:
+        base_rows: Dictionary of market code to market base row
+        prices_path: Path to global prices file
+        filepath: Path of HAPI prices file to write
+        headers: HAPI prices headers
+        positions: Position of each header's value in base row and price fields
+        dataset_id: HAPI dataset id
+        resource_id: HAPI resource id
+        column_types: Types of columns for columnar file. Defaults to None (no file).
+        batch_size: Number of rows per batch of columnar file. Defaults to 65536.
+
+    Returns:
+        Number of rows written
+    """
+    logger.info(f"Reading global prices from {prices_path}")
+    reference_periods = {}
+    with ExitStack() as stack:
+        file = stack.enter_context(open_csv(prices_path))
+
+        get_row = itemgetter(*positions)
+        ids = (dataset_id, resource_id)
+
+        def get_rows():
+            for row in DictReader(file):
+                date_str = row["date"]
+                reference_period = reference_periods.get(date_str)
+                if reference_period is None:
+                    reference_period = HAPIOutput.get_reference_period(date_str)
+                    reference_periods[date_str] = reference_period
+                yield get_row(
+                    base_rows[row["market_id"]]
+                    + (
+                        row["category"],
+                        row["commodity"],
+                        row["commodity_id"],
+                        row["unit"],
+                        row["priceflag"],
+                        row["pricetype"],
+                        row["currency"],
+                        row["price"],
+                        row["usdprice"],
+                    )
+                    + reference_period
+                    + ids
+                )
+
+        rows = get_rows()
+        if column_types is not None:
+            columnar_writer = ColumnarWriter(
+                get_columnar_path(filepath), headers, column_types, batch_size
+            )
+            rows = stack.enter_context(columnar_writer).write_through(rows)
+        return write_csv(filepath, headers, rows)
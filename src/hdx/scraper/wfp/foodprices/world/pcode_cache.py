@@ -0,0 +1,95 @@
+import logging
+from hashlib import sha256
+from importlib.metadata import version as get_version
+from json import dumps
+from os.path import exists
+
+from hdx.utilities.loader import load_json
+from hdx.utilities.saver import save_json
+
+logger = logging.getLogger(__name__)
+
+
+class PCodeCache:
+    """Cache of the admin resolution of markets that is persisted between runs.
+    Entries are keyed by country, provider admin names and the admin level
+    rules for the country. The cache is discarded if the p-code tables it was
+    built from or the version of the library matching admin names have
+    changed.
+
+    Args:
+        path: Path of cache file
+        tables_hash: Hash of p-code tables
+    """
+
+    version = 1
+
+    def __init__(self, path: str, tables_hash: str):
+        self._path = path
+        self._tables_hash = tables_hash
+        self._library_version = get_version("hdx-python-country")
+        self._entries = {}
+        self.hits = 0
+        self.misses = 0
+        if not exists(path):
+            return
+        data = load_json(path)
+        if data.get("version") != self.version:
+            logger.info(f"Ignoring p-code cache {path} with different version")
+        elif data.get("tables_hash") != tables_hash:
+            logger.info(f"Ignoring p-code cache {path} as p-code tables changed")
+        elif data.get("library_version") != self._library_version:
+            logger.info(f"Ignoring p-code cache {path} as hdx-python-country changed")
+        else:
+            self._entries = data["entries"]
+            logger.info(f"Loaded {len(self._entries)} entries from p-code cache")
+
+    @staticmethod
+    def get_tables_hash(*tables: list[dict]) -> str:
+        """Get a hash of the contents of the given tables.
+
+        Args:
+            *tables: Tables as lists of rows in dict form
+
+        Returns:
+            Hash as hex string
+        """
+        digest = sha256()
+        for table in tables:
+            for row in table:
+                digest.update(dumps(row, sort_keys=True).encode("utf-8"))
+            digest.update(b"\n")
+        return digest.hexdigest()
+
+    @staticmethod
+    def get_key(
+        countryiso3: str,
+        provider_admin1_name: str,
+        provider_admin2_name: str,
+        rules: tuple[bool, ...],
+    ) -> str:
+        return dumps([countryiso3, provider_admin1_name, provider_admin2_name, rules])
+
+    def get(self, key: str) -> dict | None:
+        entry = self._entries.get(key)
+        if entry is None:
+            self.misses += 1
+        else:
+            self.hits += 1
+        return entry
+
+    def set(self, key: str, entry: dict) -> None:
+        self._entries[key] = entry
+
+    def save(self) -> None:
+        logger.info(
+            f"P-code cache hits: {self.hits}, misses: {self.misses}. Saving "
+            f"{len(self._entries)} entries to {self._path}"
+        )
+        data = {
+            "version": self.version,
+            "tables_hash": self._tables_hash,
+            "library_version": self._library_version,
+            "entries": self._entries,
+        }
+        save_json(data, self._path)
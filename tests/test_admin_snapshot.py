@@ -0,0 +1,60 @@
+#!/usr/bin/python
+"""
+Unit tests for admin snapshot.
+
+"""
+
+from os.path import join
+
+from hdx.location.adminlevel import AdminLevel
+from hdx.utilities.downloader import Download
+from hdx.utilities.path import temp_dir
+from hdx.utilities.retriever import Retrieve
+
+from hdx.scraper.wfp.foodprices.world.admin_snapshot import AdminSnapshot
+
+
+class TestAdminSnapshot:
+    def test_admin_snapshot(self, input_dir):
+        admin_path = join(input_dir, "download-global-pcodes-adm-1-2.csv")
+        formats_path = join(input_dir, "download-global-pcode-lengths.csv")
+        paths = [admin_path, formats_path]
+        with temp_dir("TestAdminSnapshot") as tempdir:
+            with Download(user_agent="test") as downloader:
+                retriever = Retrieve(
+                    downloader, tempdir, input_dir, tempdir, save=False, use_saved=True
+                )
+                _, iterator = downloader.get_tabular_rows(admin_path, dict_form=True)
+                pcode_rows = list(iterator)
+                _, iterator = downloader.get_tabular_rows(formats_path, dict_form=True)
+                pcode_formats_rows = list(iterator)
+                admins = []
+                for i in range(2):
+                    admin = AdminLevel(admin_level=i + 1, retriever=retriever)
+                    admin.setup_from_iterable(pcode_rows, ["COG", "NIC"])
+                    admin.load_pcode_formats_from_iterable(pcode_formats_rows)
+                    admins.append(admin)
+
+                path = join(tempdir, "admin_snapshot.pkl")
+                files_hash = AdminSnapshot.get_files_hash(paths, ["COG", "NIC"])
+                snapshot = AdminSnapshot(path, files_hash)
+                assert snapshot.load(retriever) is None
+                snapshot.save(admins, "1234")
+
+                loaded_admins, tables_hash = snapshot.load(retriever)
+                assert tables_hash == "1234"
+                for admin, loaded_admin in zip(admins, loaded_admins):
+                    assert loaded_admin.admin_level == admin.admin_level
+                    for field in AdminSnapshot.state_fields:
+                        assert getattr(loaded_admin, field) == getattr(admin, field)
+                loaded_admins[1].set_parent_admins_from_adminlevels([loaded_admins[0]])
+                admins[1].set_parent_admins_from_adminlevels([admins[0]])
+                for name in ("Brazzaville", "Managua", "Pointe-Noire"):
+                    for admin, loaded_admin in zip(admins, loaded_admins):
+                        countryiso3 = "NIC" if name == "Managua" else "COG"
+                        assert loaded_admin.get_pcode(
+                            countryiso3, name
+                        ) == admin.get_pcode(countryiso3, name)
+
+                files_hash = AdminSnapshot.get_files_hash(paths, ["COG"])
+                assert AdminSnapshot(path, files_hash).load(retriever) is None
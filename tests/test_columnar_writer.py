@@ -0,0 +1,109 @@
+#!/usr/bin/python
+"""
+Unit tests for columnar writer.
+
+"""
+
+from datetime import date
+from os.path import exists, join
+
+import pyarrow.parquet as pq
+from hdx.utilities.path import temp_dir
+
+from hdx.scraper.wfp.foodprices.world.columnar_writer import (
+    ROW_BYTES,
+    ColumnarWriter,
+    RowBudget,
+    get_columnar_path,
+)
+
+
+class TestColumnarWriter:
+    def test_get_columnar_path(self):
+        assert get_columnar_path("a/prices_2024.csv") == "a/prices_2024.parquet"
+        assert get_columnar_path("a/prices_2024.csv.gz") == "a/prices_2024.parquet"
+
+    def test_columnar_writer(self):
+        headers = ["date", "market", "market_id", "price", "usdprice"]
+        column_types = {
+            "date": "date",
+            "market_id": "int",
+            "price": "float",
+            "usdprice": "float",
+        }
+        with temp_dir("TestColumnarWriter") as tempdir:
+            filepath = join(tempdir, "prices.parquet")
+            rows = [
+                {
+                    "date": "2024-01-15",
+                    "market": "Minsk",
+                    "market_id": "2618",
+                    "price": "2.89",
+                    "usdprice": "1.36",
+                    "extra": "dropped",
+                },
+                ("2024-02-15", "Minsk", 2618, 3.1, ""),
+                ("2024-02-15", "Brest", "2619", "0.84", None),
+            ]
+            with ColumnarWriter(filepath, headers, column_types, 2) as writer:
+                assert list(writer.write_through(rows)) == rows
+            assert writer.no_rows == 3
+            table = pq.read_table(filepath)
+            assert str(table.schema.field("market").type) == (
+                "dictionary<values=string, indices=int32, ordered=0>"
+            )
+            assert table.to_pylist() == [
+                {
+                    "date": date(2024, 1, 15),
+                    "market": "Minsk",
+                    "market_id": 2618,
+                    "price": 2.89,
+                    "usdprice": 1.36,
+                },
+                {
+                    "date": date(2024, 2, 15),
+                    "market": "Minsk",
+                    "market_id": 2618,
+                    "price": 3.1,
+                    "usdprice": None,
+                },
+                {
+                    "date": date(2024, 2, 15),
+                    "market": "Brest",
+                    "market_id": 2619,
+                    "price": 0.84,
+                    "usdprice": None,
+                },
+            ]
+
+            filepath = join(tempdir, "empty.parquet")
+            with ColumnarWriter(filepath, headers, column_types):
+                pass
+            assert not exists(filepath)
+
+    def test_row_budget(self):
+        headers = ["year", "price"]
+        column_types = {"year": "int", "price": "float"}
+        with temp_dir("TestColumnarWriterBudget") as tempdir:
+            budget = RowBudget(5 * ROW_BYTES)
+            assert budget.max_rows == 5
+            writers = {
+                year: ColumnarWriter(
+                    join(tempdir, f"{year}.parquet"),
+                    headers,
+                    column_types,
+                    budget=budget,
+                )
+                for year in (2023, 2024)
+            }
+            for i in range(40):
+                year = 2023 if i % 3 else 2024
+                writers[year].writerow((str(year), str(i)))
+                assert sum(len(writer) for writer in writers.values()) < 5
+            for writer in writers.values():
+                writer.close()
+            for year in (2023, 2024):
+                table = pq.read_table(join(tempdir, f"{year}.parquet"))
+                assert table.column("price").to_pylist() == [
+                    float(i) for i in range(40) if (year == 2023) == bool(i % 3)
+                ]
@@ -6,18 +6,22 @@ Unit tests for wfpfood scraper.
 
 import gc
 import logging
-from os.path import join
+from datetime import UTC, datetime
+from os import makedirs
+from os.path import exists, join
 
 from hdx.location.wfp_api import WFPAPI
 from hdx.utilities.compare import assert_files_same
 from hdx.utilities.downloader import Download
-from hdx.utilities.loader import load_yaml
+from hdx.utilities.loader import load_text, load_yaml
 from hdx.utilities.path import script_dir_plus_file, temp_dir
 from hdx.utilities.retriever import Retrieve
+from hdx.utilities.saver import save_text
 
 from hdx.scraper.wfp.foodprices.country.__main__ import main
 from hdx.scraper.wfp.foodprices.country.dataset_generator import DatasetGenerator
 from hdx.scraper.wfp.foodprices.country.wfp_food import WFPFood
+from hdx.scraper.wfp.foodprices.fx_index import FXIndex
 from hdx.scraper.wfp.foodprices.utilities import get_now, setup_currency
 from hdx.scraper.wfp.foodprices.wfp_mappings import WFPMappings
 
@@ -523,3 +527,132 @@ class TestWFP:
                     logger.info(f"Comparing {actual_file} with {expected_file}")
                     assert_files_same(expected_file, actual_file)
                     gc.collect()
+
+    def test_incremental(self, configuration, input_dir, monkeypatch):
+        country_configuration = script_dir_plus_file(
+            join("config", "project_configuration.yaml"), main
+        )
+        configuration.update(load_yaml(country_configuration))
+        with temp_dir(
+            "TestWFPFoodPricesCountryIncremental",
+            delete_on_success=True,
+            delete_on_failure=False,
+        ) as tempdir:
+            with Download(user_agent="test") as downloader:
+                retriever = Retrieve(
+                    downloader,
+                    tempdir,
+                    input_dir,
+                    tempdir,
+                    save=False,
+                    use_saved=True,
+                )
+                now = get_now(retriever)
+                wfp_api = WFPAPI(retriever)
+                wfp_mapping = WFPMappings(configuration, wfp_api, retriever)
+                commodity_to_category, _ = (
+                    wfp_mapping.build_commodity_category_mapping()
+                )
+                currencies = setup_currency(now, retriever, wfp_api)
+
+                get_market_prices_monthly = wfp_api.get_market_prices_monthly
+                no_api_prices = []
+
+                def get_prices_since(countryiso3, **kwargs):
+                    # Fixtures hold the full history so only return prices on
+                    # or after any start date as the WFP API does
+                    prices_data = get_market_prices_monthly(countryiso3, **kwargs)
+                    start_date = kwargs.get("start_date")
+                    if start_date:
+                        prices_data = [
+                            price_data
+                            for price_data in prices_data
+                            if price_data.commodity_price_date.replace(tzinfo=UTC)
+                            >= start_date
+                        ]
+                    no_api_prices.append(len(prices_data))
+                    return prices_data
+
+                monkeypatch.setattr(
+                    wfp_api, "get_market_prices_monthly", get_prices_since
+                )
+                prices_filename = "wfp_food_prices_cog.csv"
+                original_row = (
+                    "\n2011-01-15,Brazzaville,Brazzaville,Mikalou,703,-4.26,15.28,"
+                    'cereals and tubers,"Rice (mixed, low quality)",165,KG,actual,'
+                    "Retail,XAF,635,"
+                )
+                changed_row = original_row.replace(",635,", ",634,")
+                countryiso3 = "COG"
+                refresh_start_date = datetime(2023, 8, 1, tzinfo=UTC)
+                state_folder = join(tempdir, "state")
+                makedirs(state_folder)
+                datasets = []
+                for folder in ("full", "incremental"):
+                    folder = join(tempdir, folder)
+                    makedirs(folder)
+                    dataset_generator = DatasetGenerator(
+                        configuration, folder, {}, {}, currencies
+                    )
+                    dataset, _ = dataset_generator.get_dataset_and_showcase(countryiso3)
+                    wfp_food = WFPFood(
+                        countryiso3, configuration, None, None, commodity_to_category
+                    )
+                    start_date = None
+                    if datasets:
+                        # Prices before the refresh start date must come from
+                        # the kept prices file, so change one to check this
+                        state_path = join(state_folder, prices_filename)
+                        text = load_text(state_path)
+                        assert original_row in text
+                        save_text(text.replace(original_row, changed_row), state_path)
+                        assert wfp_food.read_previous_prices(
+                            downloader, state_folder, refresh_start_date
+                        )
+                        start_date = refresh_start_date
+                    assert wfp_food.get_price_markets(wfp_api, start_date)
+                    prices_info, markets, sources = wfp_food.generate_rows()
+                    dataset = dataset_generator.complete_dataset(
+                        countryiso3, dataset, prices_info, markets, sources
+                    )
+                    wfp_food.save_state(folder, state_folder)
+                    datasets.append(dataset)
+                assert datasets[0] == datasets[1]
+                full_prices, incremental_prices = no_api_prices
+                assert 0 < incremental_prices < full_prices
+                text = load_text(join(tempdir, "full", prices_filename))
+                expected_path = join(tempdir, "expected.csv")
+                save_text(text.replace(original_row, changed_row), expected_path)
+                assert_files_same(
+                    expected_path, join(tempdir, "incremental", prices_filename)
+                )
+                assert_files_same(
+                    join(tempdir, "incremental", prices_filename),
+                    join(state_folder, prices_filename),
+                )
+                assert_files_same(
+                    join(tempdir, "full", "wfp_markets_cog.csv"),
+                    join(tempdir, "incremental", "wfp_markets_cog.csv"),
+                )
+                assert not exists(
+                    join(tempdir, "incremental", wfp_food.get_sources_filename())
+                )
+
+    def test_get_usd_rate(self, configuration, monkeypatch):
+        rates = {"XAF": 600.0, "NIO": 0}
+        lookups = []
+
+        def get_historic_rate(currency, date):
+            lookups.append((currency, date))
+            return rates[currency]
+
+        monkeypatch.setattr(FXIndex, "get_historic_rate", get_historic_rate)
+        wfp_food = WFPFood("COG", configuration, None, None, {})
+        date = datetime(2024, 1, 15, tzinfo=UTC)
+        assert wfp_food.get_usd_rate("XAF", date) == 600.0
+        assert wfp_food.get_usd_rate("XAF", date) == 600.0
+        assert wfp_food.get_usd_rate("NIO", date) is None
+        assert wfp_food.get_usd_rate("NIO", date) is None
+        assert lookups == [("XAF", date), ("NIO", date)]
+        assert wfp_food.fx_cache_hits == 2
+        assert wfp_food.fx_cache_misses == 2
@@ -0,0 +1,58 @@
+#!/usr/bin/python
+"""
+Unit tests for formatting.
+
+"""
+
+from hdx.utilities.text import number_format
+from hypothesis import given
+from hypothesis import strategies as st
+from sigfig import round
+
+from hdx.scraper.wfp.foodprices.formatting import format_number, round_min_digits
+
+numbers = st.one_of(
+    st.floats(allow_nan=False, allow_infinity=False),
+    st.floats(min_value=-1e6, max_value=1e6),
+    st.floats(min_value=-0.1, max_value=0.1),
+    st.integers(min_value=-(10**12), max_value=10**12),
+    st.sampled_from([0, 0.0, -0.0, 0.005, 0.015, 1.005, 2.675, 10.0, 99.995]),
+)
+
+
+def reference_round_min_digits(val, nonevalue=""):
+    if val == "" or val is None:
+        return nonevalue
+    num_str = f"{val:.2f}"
+    count = 0
+    for digit in num_str:
+        if digit in "123456789":
+            count += 1
+    if count < 2:
+        num_str = round(val, sigfigs=2, type=str, warn=False)
+    return num_str.rstrip("0").rstrip(".")
+
+
+class TestFormatting:
+    @given(st.lists(numbers | st.sampled_from(["", None, float("nan")])))
+    def test_format_number(self, values):
+        expected = [
+            number_format(val, format="%.2f", trailing_zeros=False) for val in values
+        ]
+        assert [format_number(val) for val in values] == expected
+
+    @given(st.lists(numbers | st.sampled_from(["", None])))
+    def test_round_min_digits(self, values):
+        expected = [reference_round_min_digits(val) for val in values]
+        assert [round_min_digits(val) for val in values] == expected
+        expected = [reference_round_min_digits(val, None) for val in values]
+        assert [round_min_digits(val, None) for val in values] == expected
+
+    def test_zero(self):
+        for _ in range(2):
+            assert format_number(0.0) == "0"
+            assert format_number(-0.0) == number_format(
+                -0.0, format="%.2f", trailing_zeros=False
+            )
+            assert round_min_digits(0.0) == reference_round_min_digits(0.0)
+            assert round_min_digits(-0.0) == reference_round_min_digits(-0.0)
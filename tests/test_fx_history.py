@@ -0,0 +1,82 @@
+#!/usr/bin/python
+"""
+Unit tests for incremental FX history refresh.
+
+"""
+
+from datetime import UTC, datetime, timedelta
+from types import SimpleNamespace
+
+from hdx.location.int_timestamp import get_int_timestamp
+
+from hdx.scraper.wfp.foodprices.fx_history import IncrementalWFPExchangeRates
+
+
+class TestFXHistory:
+    def test_refresh_historic_rates(self):
+        start_date = datetime(2024, 1, 1)
+        quotes = [
+            SimpleNamespace(
+                var_date=start_date + timedelta(days=30 * i),
+                value=100.0 + i,
+                is_official=i != 9,
+            )
+            for i in range(12)
+        ]
+        quotes.reverse()
+        sdg_quotes = [
+            SimpleNamespace(
+                var_date=start_date + timedelta(days=30 * 5),
+                value=3.0,
+                is_official=False,
+            )
+        ]
+        calls = []
+
+        def get_currency_usd_indirect_quotations_since(currency, since):
+            calls.append((currency, since))
+            if currency == "XOF":
+                return []
+            if currency == "SDG":
+                return sdg_quotes
+            return [
+                quote for quote in quotes if quote.var_date.replace(tzinfo=UTC) >= since
+            ]
+
+        def get_currency_historic_rates(currency):
+            return {1: 2.0}
+
+        wfp_api = SimpleNamespace(
+            get_currency_usd_indirect_quotations_since=get_currency_usd_indirect_quotations_since
+        )
+        wfp_fx = IncrementalWFPExchangeRates(wfp_api, revision_days=60)
+        wfp_fx.get_currency_historic_rates = get_currency_historic_rates
+
+        def timestamp(i):
+            return get_int_timestamp(
+                start_date.replace(tzinfo=UTC) + timedelta(days=30 * i)
+            )
+
+        cached_rates = {
+            "AFN": {timestamp(i): 50.0 + i for i in range(8)},
+            "XOF": {timestamp(0): 600.0},
+            "EUR": {timestamp(0): 0.9},
+            "SDG": {timestamp(i): 1.0 + i for i in range(4)},
+        }
+        historic_rates = wfp_fx.refresh_historic_rates(
+            cached_rates, ["afn", "XOF", "SDG", "YER"]
+        )
+
+        def date(i):
+            return start_date.replace(tzinfo=UTC) + timedelta(days=30 * i - 60)
+
+        assert calls == [("AFN", date(7)), ("XOF", date(0)), ("SDG", date(3))]
+        expected = {timestamp(i): 50.0 + i for i in range(5)}
+        expected.update({timestamp(i): 100.0 + i for i in range(5, 12) if i != 9})
+        assert historic_rates == {
+            "AFN": expected,
+            "XOF": {timestamp(0): 600.0},
+            "SDG": {timestamp(i): 1.0 + i for i in range(4)},
+            "YER": {1: 2.0},
+        }
+        assert list(historic_rates["AFN"]) == sorted(expected)
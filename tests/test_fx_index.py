@@ -0,0 +1,58 @@
+#!/usr/bin/python
+"""
+Unit tests for FX index.
+
+"""
+
+from datetime import UTC, datetime, timedelta
+from random import Random
+
+from hdx.location.currency import Currency
+from hdx.location.int_timestamp import get_int_timestamp
+from hdx.utilities.downloader import Download
+from hdx.utilities.path import temp_dir
+from hdx.utilities.retriever import Retrieve
+
+from hdx.scraper.wfp.foodprices.fx_index import FXIndex
+
+
+class TestFXIndex:
+    def test_get_historic_rate(self, input_dir):
+        random = Random(42)
+        start_date = datetime(2019, 1, 1, tzinfo=UTC)
+        historic_rates = {}
+        for currency in ("AFN", "XAF", "YER"):
+            rates = {}
+            date = start_date
+            for _ in range(60):
+                date += timedelta(days=random.randint(1, 45))
+                rates[get_int_timestamp(date)] = random.uniform(0.5, 2000)
+            historic_rates[currency] = rates
+        historic_rates["NIO"] = {get_int_timestamp(start_date): 36.5}
+
+        with temp_dir("TestFXIndex") as tempdir:
+            with Download(user_agent="test") as downloader:
+                retriever = Retrieve(
+                    downloader,
+                    tempdir,
+                    input_dir,
+                    tempdir,
+                    save=False,
+                    use_saved=True,
+                )
+                Currency.setup(
+                    retriever=retriever,
+                    fallback_historic_to_current=True,
+                    fallback_current_to_static=False,
+                    fixed_now=datetime(2024, 1, 1, tzinfo=UTC),
+                    historic_rates_cache=historic_rates,
+                    secondary_historic_rates=historic_rates,
+                    use_secondary_historic=True,
+                )
+                FXIndex.setup(historic_rates)
+                for days in range(-10, 2800, 3):
+                    date = start_date + timedelta(days=days, hours=13)
+                    for currency in ("afn", "XAF", "YER", "NIO"):
+                        assert FXIndex.get_historic_rate(
+                            currency, date
+                        ) == Currency.get_historic_rate(currency, date)
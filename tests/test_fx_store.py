@@ -0,0 +1,48 @@
+#!/usr/bin/python
+"""
+Unit tests for FX store.
+
+"""
+
+from os.path import join
+
+from hdx.utilities.path import temp_dir
+
+from hdx.scraper.wfp.foodprices.fx_store import FXStore
+
+
+class TestFXStore:
+    def test_fx_store(self):
+        historic_rates = {
+            "AFN": {1704067200: 70.5, 1701388800: 69.25, 1706745600: 71.0},
+            "XOF": {},
+            "YER": {1704067200: 1250},
+        }
+        with temp_dir("TestFXStore") as tempdir:
+            path = join(tempdir, "wfp_rates.fx")
+            fx_store = FXStore(path)
+            assert fx_store.load() is None
+            metadata = {"currencies": [{"code": "AFN", "name": "Afghani"}]}
+            fx_store.save(historic_rates, metadata)
+            fx_store = FXStore(path)
+            result = fx_store.load()
+            assert result == historic_rates
+            assert fx_store.metadata == metadata
+            assert list(result["AFN"]) == [1701388800, 1704067200, 1706745600]
+            assert isinstance(result["YER"][1704067200], float)
+
+            with open(path, "rb") as f:
+                data = bytearray(f.read())
+            data[-1] ^= 0xFF
+            with open(path, "wb") as f:
+                f.write(data)
+            assert FXStore(path).load() is None
+
+            data[5] = 1
+            with open(path, "wb") as f:
+                f.write(data)
+            assert FXStore(path).load() is None
+
+            with open(path, "wb") as f:
+                f.write(b"WFP")
+            assert FXStore(path).load() is None
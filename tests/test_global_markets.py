@@ -0,0 +1,58 @@
+#!/usr/bin/python
+"""
+Unit tests for global markets.
+
+"""
+
+from os.path import join
+
+from hdx.utilities.downloader import Download
+from hdx.utilities.path import temp_dir
+from hdx.utilities.saver import save_text
+
+from hdx.scraper.wfp.foodprices.world.global_markets import get_markets
+
+
+class TestGlobalMarkets:
+    def test_get_markets(self):
+        headers = "market_id,market,countryiso3,admin1,admin2,latitude,longitude\n"
+        with temp_dir("TestGlobalMarkets") as tempdir:
+            with Download(user_agent="test") as downloader:
+                assert get_markets(downloader, tempdir) is None
+                save_text(
+                    f"{headers}7,A,BLR,,,,\n12,B,BLR,,,,\n",
+                    join(tempdir, "wfp_markets_blr.csv"),
+                )
+                save_text(
+                    f"{headers}30,C,COG,,,,\n3,D,COG,,,,\n12,E,COG,,,,\n",
+                    join(tempdir, "wfp_markets_cog.csv"),
+                )
+                save_text(
+                    f"{headers}8,F,NIC,,,,\n100,G,NIC,,,,\n",
+                    join(tempdir, "wfp_markets_nic.csv"),
+                )
+                save_text(
+                    f"{headers}1,Z,BLR,,,,\n",
+                    join(tempdir, "wfp_markets_global.csv"),
+                )
+                markets = get_markets(downloader, tempdir)
+                assert len(markets) == 7
+                assert markets.duplicates == 1
+                assert [row["market"] for row in markets] == [
+                    "A",
+                    "B",
+                    "C",
+                    "D",
+                    "E",
+                    "F",
+                    "G",
+                ]
+                assert [row["market_id"] for row in markets.iterate_sorted()] == [
+                    "3",
+                    "7",
+                    "8",
+                    "12",
+                    "12",
+                    "30",
+                    "100",
+                ]
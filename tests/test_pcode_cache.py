@@ -0,0 +1,57 @@
+#!/usr/bin/python
+"""
+Unit tests for p-code cache.
+
+"""
+
+from os.path import join
+
+from hdx.utilities.path import temp_dir
+
+from hdx.scraper.wfp.foodprices.world import pcode_cache as pcode_cache_module
+from hdx.scraper.wfp.foodprices.world.pcode_cache import PCodeCache
+
+
+class TestPCodeCache:
+    def test_pcode_cache(self, monkeypatch):
+        pcode_rows = [{"Location": "COG", "P-Code": "CG02", "Name": "Brazzaville"}]
+        pcode_formats_rows = [{"Location": "COG", "Admin Level": "1", "Length": "4"}]
+        tables_hash = PCodeCache.get_tables_hash(pcode_rows, pcode_formats_rows)
+        key = PCodeCache.get_key(
+            "COG", "Brazzaville", "Brazzaville", (False, False, False)
+        )
+        entry = {
+            "provider_admin1_name": "Brazzaville",
+            "provider_admin2_name": "Brazzaville",
+            "admin1_code": "CG02",
+            "admin1_name": "Brazzaville",
+            "admin2_code": "",
+            "admin2_name": "",
+            "admin_level": 2,
+            "warnings": ["no adm2 name"],
+            "messages": [
+                ["add_missing_value_message", "COG-CG02", "admin 2 name for market"]
+            ],
+        }
+        with temp_dir("TestPCodeCache") as tempdir:
+            path = join(tempdir, "pcode_cache.json")
+            pcode_cache = PCodeCache(path, tables_hash)
+            assert pcode_cache.get(key) is None
+            pcode_cache.set(key, entry)
+            pcode_cache.save()
+
+            pcode_cache = PCodeCache(path, tables_hash)
+            assert pcode_cache.get(key) == entry
+            assert pcode_cache.get(key.replace("COG", "BLR")) is None
+            assert (pcode_cache.hits, pcode_cache.misses) == (1, 1)
+
+            pcode_rows[0]["Name"] = "Brazzaville City"
+            changed_hash = PCodeCache.get_tables_hash(pcode_rows, pcode_formats_rows)
+            assert changed_hash != tables_hash
+            pcode_cache = PCodeCache(path, changed_hash)
+            assert pcode_cache.get(key) is None
+
+            assert PCodeCache(path, tables_hash).get(key) == entry
+            monkeypatch.setattr(pcode_cache_module, "get_version", lambda _: "999.0.0")
+            pcode_cache = PCodeCache(path, tables_hash)
+            assert pcode_cache.get(key) is None
@@ -0,0 +1,61 @@
+#!/usr/bin/python
+"""
+Unit tests for price store.
+
+"""
+
+from hdx.scraper.wfp.foodprices.country.price_store import PriceStore
+
+
+class TestPriceStore:
+    def test_price_store(self):
+        rows = {
+            (
+                "actual",
+                "2024-02-15",
+                "Brazzaville",
+                "",
+                "Total",
+                "cereals and tubers",
+                "Rice",
+                "KG",
+                "Retail",
+            ): (1, "-4.27", "15.28", 52, "XAF", 800.0, 1.32),
+            (
+                "actual",
+                "2024-01-15",
+                "Brazzaville",
+                "",
+                "Total",
+                "cereals and tubers",
+                "Rice",
+                "KG",
+                "Retail",
+            ): (1, "-4.27", "15.28", 52, "XAF", 750.0, None),
+            (
+                "aggregate",
+                "2024-01-15",
+                "Bouenza",
+                "",
+                "Madingou",
+                "oil and fats",
+                "Oil (vegetable)",
+                "L",
+                "Retail",
+            ): (2, "", "", 96, "XAF", 1500.5, 2.48),
+        }
+        price_store = PriceStore()
+        assert not price_store
+        for key, values in rows.items():
+            assert price_store.add(key, *values) is not None
+        key = next(iter(rows))
+        assert price_store.add(key, 3, "", "", 1, "USD", 1.0) is None
+        assert len(price_store) == 3
+        assert sorted(price_store.get_dates()) == ["2024-01-15", "2024-02-15"]
+        assert price_store.get_row(0) == (key, rows[key])
+        price_store.set_usdprice(1, 1.24)
+        assert price_store.get_price(1) == 750.0
+        expected = sorted(rows.items())
+        key, values = expected[0]
+        expected[0] = key, values[:6] + (1.24,)
+        assert list(price_store.iterate_sorted()) == expected
@@ -0,0 +1,57 @@
+#!/usr/bin/python
+"""
+Unit tests for source processing.
+
+"""
+
+from hdx.scraper.wfp.foodprices.country.source_processing import SourceProcessor
+
+
+class TestSourceProcessing:
+    raw_sources = (
+        "Field Monitors/Thrid Party Monitor (TPM)",
+        "WFP Syria CO",
+        "Field Monitors/Qamishly Sub Office",
+        "WFP/ ",
+        "Field Monitors/Third Party Monitor (TPM)",
+        "M/o Agriculture + WFP mVAM",
+        "Government of Syria,Ministry of Agriculture.",
+        "Instituto Nacional de Estad?stica",
+        "mVAM",
+        "WFP Syria CO",
+        "Field Monitors/Thrid Party Monitor (TPM)",
+    )
+    expected_sources = {
+        "field monitors": "Field Monitors",
+        "thrid party monitor (tpm)": "Thrid Party Monitor (TPM)",
+        "wfp syria co": "WFP Syria CO",
+        "qamishly sub office": "Qamishly Sub Office",
+        "wfp": "WFP",
+        "ministry of agriculture": "Ministry of Agriculture",
+        "wfp mvam": "WFP mVAM",
+        "instituto nacional de estadística": "Instituto Nacional de Estadística",
+    }
+
+    def test_source_processor(self):
+        sources = {}
+        source_processor = SourceProcessor(sources)
+        for raw_source in self.raw_sources:
+            source_processor.process(raw_source)
+        assert source_processor.get_sources() is sources
+        assert sources == self.expected_sources
+        assert list(sources) == list(self.expected_sources)
+
+    def test_existing_sources(self):
+        source_processor = SourceProcessor(dict(self.expected_sources))
+        source_processor.process("Field Monitors/Third Party Monitors (TPM)")
+        assert source_processor.get_sources() == self.expected_sources
+
+    def test_repeated_raw_source(self):
+        sources = {}
+        source_processor = SourceProcessor(sources)
+        for raw_source in ("WFP", "Wfp", "WFP"):
+            source_processor.process(raw_source)
+        assert sources == {"wfp": "WFP"}
+        for raw_source in ("Field monitors", "Field Monitors", "Field monitors"):
+            source_processor.process(raw_source)
+        assert sources == {"wfp": "WFP", "field monitors": "Field monitors"}
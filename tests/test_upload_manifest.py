@@ -0,0 +1,71 @@
+#!/usr/bin/python
+"""
+Unit tests for upload manifest.
+
+"""
+
+from os.path import join
+
+from hdx.data.dataset import Dataset
+from hdx.data.resource import Resource
+from hdx.utilities.path import temp_dir
+from hdx.utilities.saver import save_text
+
+from hdx.scraper.wfp.foodprices.upload_manifest import UploadManifest
+
+
+class TestUploadManifest:
+    def test_upload_manifest(self, configuration, monkeypatch):
+        created = []
+
+        def create_in_hdx(dataset, **kwargs):
+            created.append(dataset["name"])
+            dataset["id"] = f"id-{len(created)}"
+            for resource in dataset.get_resources():
+                resource["id"] = f"{dataset['id']}-{resource['name']}"
+
+        monkeypatch.setattr(Dataset, "create_in_hdx", create_in_hdx)
+        marked = []
+
+        def update_in_hdx(resource, **kwargs):
+            assert resource.get_file_to_upload() is None
+            assert resource.is_marked_data_updated()
+            assert kwargs == {"operation": "patch"}
+            marked.append(resource["id"])
+
+        monkeypatch.setattr(Resource, "update_in_hdx", update_in_hdx)
+
+        with temp_dir("TestUploadManifest") as tempdir:
+            filepath = join(tempdir, "wfp_food_prices_cog.csv")
+            save_text("date,price\r\n2024-01-15,1.5\r\n", filepath)
+
+            def get_dataset(title: str) -> Dataset:
+                dataset = Dataset({"name": "wfp-food-prices-for-congo", "title": title})
+                resource = Resource({"name": "prices", "description": "Prices"})
+                resource.set_format("csv")
+                resource.set_file_to_upload(filepath)
+                dataset.add_update_resource(resource)
+                return dataset
+
+            path = join(tempdir, "manifest.json")
+            manifest = UploadManifest(path)
+            assert manifest.create_in_hdx(get_dataset("Congo"), batch="1") is True
+
+            manifest = UploadManifest(path)
+            dataset = get_dataset("Congo")
+            assert manifest.create_in_hdx(dataset, batch="2") is False
+            assert dataset["id"] == "id-1"
+            assert dataset.get_resource()["id"] == "id-1-prices"
+            assert manifest.skipped == 1
+            assert marked == ["id-1-prices"]
+
+            assert manifest.create_in_hdx(get_dataset("Congo Rep")) is True
+            save_text("date,price\r\n2024-01-15,1.6\r\n", filepath)
+            assert manifest.create_in_hdx(get_dataset("Congo Rep")) is True
+            assert manifest.create_in_hdx(get_dataset("Congo Rep")) is False
+            assert len(created) == 3
+            assert marked == ["id-1-prices", "id-3-prices"]
+
+            manifest = UploadManifest()
+            assert manifest.create_in_hdx(get_dataset("Congo Rep")) is True
+            assert len(created) == 4
@@ -0,0 +1,96 @@
+#!/usr/bin/python
+"""
+Unit tests for utilities.
+
+"""
+
+from glob import glob
+from os.path import join
+from time import sleep
+
+from hdx.location.wfp_api import WFPAPI
+from hdx.location.wfp_exchangerates import WFPExchangeRates
+from hdx.utilities.dateparse import parse_date
+from hdx.utilities.downloader import Download
+from hdx.utilities.loader import load_text
+from hdx.utilities.path import temp_dir
+from hdx.utilities.retriever import Retrieve
+
+from hdx.scraper.wfp.foodprices.utilities import (
+    get_currencies,
+    get_now,
+    parse_iso_date,
+    progress_storing_pool,
+    setup_currency,
+)
+
+
+class TestUtilities:
+    def test_progress_storing_pool(self, monkeypatch):
+        countries = [{"iso3": iso3} for iso3 in ("AFG", "BDI", "COG", "NIC", "SYR")]
+        delays = {"AFG": 0.2, "BDI": 0.0, "COG": 0.1, "NIC": 0.0, "SYR": 0.0}
+
+        def function(country):
+            iso3 = country["iso3"]
+            sleep(delays[iso3])
+            return iso3.lower()
+
+        monkeypatch.delenv("WHERETOSTART", raising=False)
+        with temp_dir("TestProgressStoringPool") as tempdir:
+            info = {"folder": tempdir}
+            progress_file = join(tempdir, "progress.txt")
+            results = []
+            for info, country, result in progress_storing_pool(
+                info, countries, "iso3", function, workers=3
+            ):
+                assert load_text(progress_file) == f"iso3={country['iso3']}"
+                results.append(result)
+            assert results == ["afg", "bdi", "cog", "nic", "syr"]
+
+            monkeypatch.setenv("WHERETOSTART", "iso3=COG")
+            results = [
+                result
+                for _, _, result in progress_storing_pool(
+                    info, countries, "iso3", function, workers=3
+                )
+            ]
+            assert results == ["cog", "nic", "syr"]
+
+    def test_parse_iso_date(self, country_dir):
+        dates = set()
+        with Download(user_agent="test") as downloader:
+            for filepath in glob(join(country_dir, "wfp_food_prices_*.csv")):
+                _, iterator = downloader.get_tabular_rows(
+                    filepath, dict_form=True, encoding="utf-8"
+                )
+                dates.update(row["date"] for row in iterator)
+        assert len(dates) > 100
+        for date_str in dates:
+            assert parse_iso_date(date_str) == parse_date(date_str)
+        assert parse_iso_date("2024-01-15") is parse_iso_date("2024-01-15")
+        assert parse_iso_date("15/01/2024") == parse_date("15/01/2024")
+
+    def test_currency_bootstrap(self, input_dir, monkeypatch):
+        with temp_dir("TestCurrencyBootstrap") as tempdir:
+            with Download(user_agent="test") as downloader:
+                retriever = Retrieve(
+                    downloader,
+                    tempdir,
+                    input_dir,
+                    tempdir,
+                    save=False,
+                    use_saved=True,
+                )
+                now = get_now(retriever)
+                wfp_api = WFPAPI(retriever)
+                currencies = setup_currency(now, retriever, wfp_api, tempdir)
+                assert len(currencies) == 127
+
+                def get_currencies_info(self):
+                    raise AssertionError("Currencies fetched from WFP API!")
+
+                monkeypatch.setattr(
+                    WFPExchangeRates, "get_currencies_info", get_currencies_info
+                )
+                assert setup_currency(now, retriever, wfp_api, tempdir) == currencies
+                assert get_currencies(wfp_api, tempdir) == currencies
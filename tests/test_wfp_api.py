@@ -0,0 +1,91 @@
+#!/usr/bin/python
+"""
+Unit tests for throttled WFP API.
+
+"""
+
+from datetime import UTC, datetime, timedelta
+from threading import Lock
+from types import SimpleNamespace
+
+from hdx.utilities.downloader import Download
+from hdx.utilities.path import temp_dir
+from hdx.utilities.retriever import Retrieve
+
+from hdx.scraper.wfp.foodprices.wfp_api import ThrottledWFPAPI
+
+
+class TestWFPAPI:
+    def test_get_market_prices_monthly(self):
+        total_items = 23
+        page_size = 5
+        pages_called = []
+        lock = Lock()
+
+        def market_prices_price_monthly_get(page, country_code):
+            assert country_code == "COG"
+            with lock:
+                pages_called.append(page)
+            start = (page - 1) * page_size
+            end = min(start + page_size, total_items)
+            return SimpleNamespace(
+                items=list(range(start, end)), page=page, total_items=total_items
+            )
+
+        with temp_dir("TestThrottledWFPAPI") as tempdir:
+            with Download(user_agent="test") as downloader:
+                retriever = Retrieve(
+                    downloader,
+                    tempdir,
+                    tempdir,
+                    tempdir,
+                    save=False,
+                    use_saved=False,
+                )
+                wfp_api = ThrottledWFPAPI(
+                    retriever, {"calls": 10, "period": 0.01}, page_workers=3
+                )
+                wfp_api.market_prices_api.market_prices_price_monthly_get = (
+                    market_prices_price_monthly_get
+                )
+                items = wfp_api.get_market_prices_monthly(countryiso3="COG")
+                assert items == list(range(total_items))
+                assert sorted(pages_called) == [1, 2, 3, 4, 5, 6]
+
+    def test_get_currency_usd_indirect_quotations_since(self):
+        start_date = datetime(2024, 1, 1)
+        quotes = [
+            SimpleNamespace(var_date=start_date + timedelta(days=30 * i), value=i)
+            for i in range(12)
+        ]
+        quotes.reverse()
+        pages_called = []
+
+        def currency_usd_indirect_quotation_get(page, currency_name):
+            assert currency_name == "AFN"
+            pages_called.append(page)
+            return SimpleNamespace(items=quotes[(page - 1) * 3 : page * 3])
+
+        with temp_dir("TestThrottledWFPAPISince") as tempdir:
+            with Download(user_agent="test") as downloader:
+                retriever = Retrieve(
+                    downloader,
+                    tempdir,
+                    tempdir,
+                    tempdir,
+                    save=False,
+                    use_saved=False,
+                )
+                wfp_api = ThrottledWFPAPI(retriever, {"calls": 10, "period": 0.01})
+                wfp_api.currency_api.currency_usd_indirect_quotation_get = (
+                    currency_usd_indirect_quotation_get
+                )
+                since = start_date.replace(tzinfo=UTC) + timedelta(days=30 * 5)
+                items = wfp_api.get_currency_usd_indirect_quotations_since("AFN", since)
+                assert [quote.value for quote in items] == [11, 10, 9, 8, 7, 6, 5]
+                assert pages_called == [1, 2, 3]
+                pages_called.clear()
+                since = start_date + timedelta(days=30 * 12)
+                items = wfp_api.get_currency_usd_indirect_quotations_since("AFN", since)
+                assert items == []
+                assert pages_called == [1]
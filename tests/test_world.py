@@ -5,8 +5,10 @@ Unit tests for wfpfood scraper.
 """
 
 import gc
+import gzip
 import logging
 from datetime import UTC, datetime
+from os import makedirs
 from os.path import join
 
 import pytest
@@ -528,3 +530,185 @@ class TestWFP:
                             logger.info(f"Comparing {actual_file} with {expected_file}")
                             assert_files_same(expected_file, actual_file)
                             gc.collect()
+
+    def test_get_years_and_create_prices_files(self, configuration, country_dir):
+        global_configuration = script_dir_plus_file(
+            join("config", "project_configuration.yaml"), main
+        )
+        configuration.update(load_yaml(global_configuration))
+        with temp_dir(
+            "TestWFPFoodPricesGlobalFused",
+            delete_on_success=True,
+            delete_on_failure=False,
+        ) as tempdir:
+            with Download(user_agent="test") as downloader:
+                prices_generator = GlobalPricesGenerator(
+                    configuration, downloader, country_dir
+                )
+                start_date, end_date = prices_generator.get_years_per_country()
+                expected_dir = join(tempdir, "expected")
+                makedirs(expected_dir)
+                expected_year_to_pricespath = prices_generator.create_prices_files(
+                    expected_dir
+                )
+
+                prices_generator = GlobalPricesGenerator(
+                    configuration, downloader, country_dir
+                )
+                result = prices_generator.get_years_and_create_prices_files(tempdir)
+                assert result[:2] == (start_date, end_date)
+                year_to_pricespath = result[2]
+                assert list(year_to_pricespath) == list(range(2024, 1999, -1))
+                assert list(year_to_pricespath) == list(expected_year_to_pricespath)
+                for year, actual_file in year_to_pricespath.items():
+                    assert_files_same(expected_year_to_pricespath[year], actual_file)
+
+    def test_get_price_row_layout(self):
+        headers = ["market_code", "price", "location_code", "error", "unit"]
+        market_headers, positions = HAPIOutput.get_price_row_layout(headers)
+        assert market_headers == ["market_code", "location_code", "error"]
+        base_row = ("1", "AFG", "")
+        price_values = tuple(f"{field}_value" for field in HAPIOutput.price_fields)
+        values = base_row + price_values
+        assert [values[position] for position in positions] == [
+            "1",
+            "price_value",
+            "AFG",
+            "",
+            "unit_value",
+        ]
+
+    def test_create_prices_files_workers(
+        self, configuration, global_dir, input_dir, country_dir
+    ):
+        global_configuration = script_dir_plus_file(
+            join("config", "project_configuration.yaml"), main
+        )
+        configuration.update(load_yaml(global_configuration))
+        with HDXErrorHandler() as error_handler:
+            with temp_dir(
+                "TestWFPFoodPricesGlobalWorkers",
+                delete_on_success=True,
+                delete_on_failure=False,
+            ) as tempdir:
+                with Download(user_agent="test") as downloader:
+                    retriever = Retrieve(
+                        downloader,
+                        tempdir,
+                        input_dir,
+                        tempdir,
+                        save=False,
+                        use_saved=True,
+                    )
+                    hapi_output = HAPIOutput(
+                        configuration,
+                        downloader,
+                        tempdir,
+                        error_handler,
+                    )
+                    hapi_output.setup_admins(retriever)
+                    markets = get_markets(downloader, country_dir)
+                    hapi_output.process_markets(markets, "1234", "5678")
+                    year_to_pricespath = {
+                        year: join(global_dir, f"wfp_food_prices_global_{year}.csv")
+                        for year in range(2012, 2025)
+                    }
+                    year_to_prices_resource_id = {
+                        year: "9101112" for year in range(2000, 2025)
+                    }
+                    sequential_dir = join(tempdir, "sequential")
+                    makedirs(sequential_dir)
+                    expected_year_to_pricespath = hapi_output.create_prices_files(
+                        year_to_pricespath,
+                        "1234",
+                        year_to_prices_resource_id,
+                        sequential_dir,
+                    )
+                    hapi_year_to_pricespath = hapi_output.create_prices_files(
+                        year_to_pricespath,
+                        "1234",
+                        year_to_prices_resource_id,
+                        tempdir,
+                        workers=3,
+                    )
+                    assert list(hapi_year_to_pricespath) == list(range(2024, 2014, -1))
+                    assert list(hapi_year_to_pricespath) == list(
+                        expected_year_to_pricespath
+                    )
+                    for year, actual_file in hapi_year_to_pricespath.items():
+                        assert_files_same(
+                            expected_year_to_pricespath[year], actual_file
+                        )
+
+    def test_create_prices_files_compressed(
+        self, configuration, input_dir, country_dir
+    ):
+        global_configuration = script_dir_plus_file(
+            join("config", "project_configuration.yaml"), main
+        )
+        configuration.update(load_yaml(global_configuration))
+        with HDXErrorHandler() as error_handler:
+            with temp_dir(
+                "TestWFPFoodPricesGlobalCompressed",
+                delete_on_success=True,
+                delete_on_failure=False,
+            ) as tempdir:
+                with Download(user_agent="test") as downloader:
+                    prices_generator = GlobalPricesGenerator(
+                        configuration, downloader, country_dir
+                    )
+                    expected_dir = join(tempdir, "expected")
+                    makedirs(expected_dir)
+                    expected_year_to_pricespath = prices_generator.create_prices_files(
+                        expected_dir
+                    )
+                    year_to_pricespath = prices_generator.create_prices_files(
+                        tempdir, compress=True
+                    )
+                    assert list(year_to_pricespath) == list(expected_year_to_pricespath)
+                    for year, actual_file in year_to_pricespath.items():
+                        assert actual_file.endswith(".csv.gz")
+                        with gzip.open(actual_file, "rb") as f:
+                            actual = f.read()
+                        with open(expected_year_to_pricespath[year], "rb") as f:
+                            assert actual == f.read()
+
+                    retriever = Retrieve(
+                        downloader,
+                        tempdir,
+                        input_dir,
+                        tempdir,
+                        save=False,
+                        use_saved=True,
+                    )
+                    hapi_output = HAPIOutput(
+                        configuration,
+                        downloader,
+                        tempdir,
+                        error_handler,
+                    )
+                    hapi_output.setup_admins(retriever)
+                    markets = get_markets(downloader, country_dir)
+                    hapi_output.process_markets(markets, "1234", "5678")
+                    year_to_prices_resource_id = {
+                        year: "9101112" for year in range(2000, 2025)
+                    }
+                    expected_year_to_pricespath = hapi_output.create_prices_files(
+                        expected_year_to_pricespath,
+                        "1234",
+                        year_to_prices_resource_id,
+                        expected_dir,
+                    )
+                    hapi_year_to_pricespath = hapi_output.create_prices_files(
+                        year_to_pricespath,
+                        "1234",
+                        year_to_prices_resource_id,
+                        tempdir,
+                        compress=True,
+                    )
+                    for year, actual_file in hapi_year_to_pricespath.items():
+                        assert actual_file.endswith(".csv.gz")
+                        with gzip.open(actual_file, "rb") as f:
+                            actual = f.read()
+                        with open(expected_year_to_pricespath[year], "rb") as f:
+                            assert actual == f.read()